@@ -0,0 +1,31 @@
+"""trigram name indexes
+
+Revision ID: b7d3e0f5a914
+Revises: 9e2f4b6c81a3
+Create Date: 2026-10-17 14:03:27.104855
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e0f5a914'
+down_revision: Union[str, None] = '9e2f4b6c81a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('warehouse', 'serial_number', 'supplier', 'manufacturer')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        op.create_index(f'ix_{table}_name_trgm', table, ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_name_trgm', table_name=table, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
@@ -0,0 +1,38 @@
+"""search_vector columns
+
+Revision ID: d41a8c2e6f07
+Revises: b7d3e0f5a914
+Create Date: 2026-10-17 15:30:52.418390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a8c2e6f07'
+down_revision: Union[str, None] = 'b7d3e0f5a914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTORS = {
+    'warehouse': "coalesce(article, '') || ' ' || coalesce(name, '') || ' ' || coalesce(description, '')",
+    'serial_number': "coalesce(name, '')",
+    'supplier': "coalesce(name, '') || ' ' || coalesce(country, '')",
+    'manufacturer': "coalesce(name, '') || ' ' || coalesce(country, '')",
+}
+
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(f"to_tsvector('simple', {expression})", persisted=True), nullable=True))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTORS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_using='gin')
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,93 @@
+"""stock_summary table maintained by serial_number triggers
+
+Revision ID: e8b4f1a3c205
+Revises: d41a8c2e6f07
+Create Date: 2026-10-17 16:55:13.207614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4f1a3c205'
+down_revision: Union[str, None] = 'd41a8c2e6f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Adds the totals of `rows` (a transition table) multiplied by `sign` to stock_summary.
+# Rows are applied in key order so that concurrent writers lock summary rows consistently.
+APPLY_ROWS = """
+    INSERT INTO stock_summary AS s (warehouse_id, status, serial_numbers, price_input, price_output, margin, updated_at)
+    SELECT warehouse_id, status,
+           {sign} * count(*),
+           {sign} * coalesce(sum(price_input), 0),
+           {sign} * coalesce(sum(price_output), 0),
+           {sign} * coalesce(sum(price_output - price_input), 0),
+           now()
+    FROM {rows}
+    WHERE deleted_at IS NULL
+    GROUP BY warehouse_id, status
+    ORDER BY warehouse_id, status
+    ON CONFLICT (warehouse_id, status) DO UPDATE SET
+        serial_numbers = s.serial_numbers + excluded.serial_numbers,
+        price_input = s.price_input + excluded.price_input,
+        price_output = s.price_output + excluded.price_output,
+        margin = s.margin + excluded.margin,
+        updated_at = excluded.updated_at;
+"""
+
+APPLY_FUNCTION = f"""
+CREATE FUNCTION stock_summary_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {APPLY_ROWS.format(sign=-1, rows='old_rows')}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {APPLY_ROWS.format(sign=1, rows='new_rows')}
+    END IF;
+    RETURN NULL;
+END;
+$$
+"""
+
+# Transition tables can not be shared by a trigger with several events.
+TRIGGERS = {
+    'stock_summary_insert': 'INSERT ON serial_number REFERENCING NEW TABLE AS new_rows',
+    'stock_summary_update': 'UPDATE ON serial_number REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'stock_summary_delete': 'DELETE ON serial_number REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    op.create_table('stock_summary',
+    sa.Column('warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('WAREHOUSE', 'SUPPLIER', 'SOLD', 'EXECUTOR', name='serialnumberstatusenum', create_type=False), nullable=False),
+    sa.Column('serial_numbers', sa.BigInteger(), nullable=False),
+    sa.Column('price_input', sa.BigInteger(), nullable=False),
+    sa.Column('price_output', sa.BigInteger(), nullable=False),
+    sa.Column('margin', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['warehouse_id'], ['warehouse.id'], ),
+    sa.PrimaryKeyConstraint('warehouse_id', 'status')
+    )
+    op.execute("LOCK TABLE serial_number IN SHARE MODE")
+    op.execute(
+        "INSERT INTO stock_summary "
+        "SELECT warehouse_id, status, count(*), coalesce(sum(price_input), 0), "
+        "coalesce(sum(price_output), 0), coalesce(sum(price_output - price_input), 0), now() "
+        "FROM serial_number WHERE deleted_at IS NULL GROUP BY warehouse_id, status"
+    )
+    op.execute(APPLY_FUNCTION)
+    for name, event in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} AFTER {event} FOR EACH STATEMENT EXECUTE FUNCTION stock_summary_apply()")
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON serial_number")
+    op.execute("DROP FUNCTION stock_summary_apply()")
+    op.drop_table('stock_summary')
@@ -0,0 +1,29 @@
+"""serial_number date indexes for aging and turnover reports
+
+Revision ID: f2c9d7e4a816
+Revises: e8b4f1a3c205
+Create Date: 2026-10-17 17:40:26.814052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d7e4a816'
+down_revision: Union[str, None] = 'e8b4f1a3c205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_serial_number_warehouse_status_data_input', 'serial_number', ['warehouse_id', 'status', 'data_input'], unique=False)
+    op.create_index('ix_serial_number_data_input_brin', 'serial_number', ['data_input'], unique=False, postgresql_using='brin')
+    op.create_index('ix_serial_number_data_output_brin', 'serial_number', ['data_output'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_serial_number_data_output_brin', table_name='serial_number', postgresql_using='brin')
+    op.drop_index('ix_serial_number_data_input_brin', table_name='serial_number', postgresql_using='brin')
+    op.drop_index('ix_serial_number_warehouse_status_data_input', table_name='serial_number')
@@ -0,0 +1,38 @@
+"""partial lookup indexes for not deleted rows and warehouse FK indexes
+
+Revision ID: 0a7e5c3b9d14
+Revises: f2c9d7e4a816
+Create Date: 2026-10-17 18:25:47.095318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e5c3b9d14'
+down_revision: Union[str, None] = 'f2c9d7e4a816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOT_DELETED_TABLES = ('serial_number', 'warehouse', 'supplier', 'manufacturer')
+
+
+def upgrade() -> None:
+    for table in NOT_DELETED_TABLES:
+        op.create_index(f'ix_{table}_id_not_deleted', table, ['id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_manufacturer_name_country', 'manufacturer', ['name', 'country'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_supplier_lookup', 'supplier', ['name', 'country', 'address', 'phone', 'email'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_warehouse_supplier_id', 'warehouse', ['supplier_id'], unique=False)
+    op.create_index('ix_warehouse_manufacturer_id', 'warehouse', ['manufacturer_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_warehouse_manufacturer_id', table_name='warehouse')
+    op.drop_index('ix_warehouse_supplier_id', table_name='warehouse')
+    op.drop_index('ix_supplier_lookup', table_name='supplier', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.drop_index('ix_manufacturer_name_country', table_name='manufacturer', postgresql_where=sa.text('deleted_at IS NULL'))
+    for table in NOT_DELETED_TABLES:
+        op.drop_index(f'ix_{table}_id_not_deleted', table_name=table, postgresql_where=sa.text('deleted_at IS NULL'))
@@ -0,0 +1,98 @@
+"""stock_summary version watermark and TRUNCATE reset
+
+Revision ID: 3c6e9a2f7b18
+Revises: 0a7e5c3b9d14
+Create Date: 2026-10-17 19:10:42.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c6e9a2f7b18'
+down_revision: Union[str, None] = '0a7e5c3b9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same delta upsert as in the stock_summary migration.
+APPLY_ROWS = """
+    INSERT INTO stock_summary AS s (warehouse_id, status, serial_numbers, price_input, price_output, margin, updated_at)
+    SELECT warehouse_id, status,
+           {sign} * count(*),
+           {sign} * coalesce(sum(price_input), 0),
+           {sign} * coalesce(sum(price_output), 0),
+           {sign} * coalesce(sum(price_output - price_input), 0),
+           now()
+    FROM {rows}
+    WHERE deleted_at IS NULL
+    GROUP BY warehouse_id, status
+    ORDER BY warehouse_id, status
+    ON CONFLICT (warehouse_id, status) DO UPDATE SET
+        serial_numbers = s.serial_numbers + excluded.serial_numbers,
+        price_input = s.price_input + excluded.price_input,
+        price_output = s.price_output + excluded.price_output,
+        margin = s.margin + excluded.margin,
+        updated_at = excluded.updated_at;
+"""
+
+
+def apply_function(versioned: bool) -> str:
+    """stock_summary_apply; the versioned one also empties the summary on TRUNCATE and counts
+    every statement it applied in stock_summary_applied_version."""
+    truncate = "IF TG_OP = 'TRUNCATE' THEN DELETE FROM stock_summary; END IF;" if versioned else ""
+    applied = "PERFORM nextval('stock_summary_applied_version');" if versioned else ""
+    return f"""
+CREATE OR REPLACE FUNCTION stock_summary_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {truncate}
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {APPLY_ROWS.format(sign=-1, rows='old_rows')}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {APPLY_ROWS.format(sign=1, rows='new_rows')}
+    END IF;
+    {applied}
+    RETURN NULL;
+END;
+$$
+"""
+
+
+# Counts every write statement on serial_number independently of the apply triggers, so a
+# disabled or bypassed apply trigger shows up as source version > applied version. Sequences
+# are used because they are not locked, a counter row would serialize all writers.
+WATERMARK_FUNCTION = """
+CREATE FUNCTION stock_summary_watermark() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM nextval('stock_summary_source_version');
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE stock_summary_source_version")
+    op.execute("CREATE SEQUENCE stock_summary_applied_version")
+    op.execute(apply_function(versioned=True))
+    op.execute(WATERMARK_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER stock_summary_truncate AFTER TRUNCATE ON serial_number "
+        "FOR EACH STATEMENT EXECUTE FUNCTION stock_summary_apply()"
+    )
+    # named to sort after the apply triggers, which fire in name order
+    op.execute(
+        "CREATE TRIGGER stock_summary_watermark AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+        "ON serial_number FOR EACH STATEMENT EXECUTE FUNCTION stock_summary_watermark()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER stock_summary_watermark ON serial_number")
+    op.execute("DROP TRIGGER stock_summary_truncate ON serial_number")
+    op.execute("DROP FUNCTION stock_summary_watermark()")
+    op.execute(apply_function(versioned=False))
+    op.execute("DROP SEQUENCE stock_summary_applied_version")
+    op.execute("DROP SEQUENCE stock_summary_source_version")
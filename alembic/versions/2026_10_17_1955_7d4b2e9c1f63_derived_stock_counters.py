@@ -0,0 +1,111 @@
+"""stock_summary slots, warehouse stock counters derived from stock_summary
+
+Revision ID: 7d4b2e9c1f63
+Revises: 3c6e9a2f7b18
+Create Date: 2026-10-17 19:55:08.731942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4b2e9c1f63'
+down_revision: Union[str, None] = '3c6e9a2f7b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every connection adds its deltas to its own slot of a (warehouse_id, status) pair, so
+# concurrent writers of one warehouse do not wait for each other's summary row locks.
+# Readers sum over the slots.
+SLOTS = 16
+
+# Same delta upsert as in the stock_summary migration, into the slot of the connection.
+APPLY_ROWS = """
+    INSERT INTO stock_summary AS s (warehouse_id, status, {slot_column}serial_numbers, price_input, price_output, margin, updated_at)
+    SELECT warehouse_id, status, {slot_value}
+           {sign} * count(*),
+           {sign} * coalesce(sum(price_input), 0),
+           {sign} * coalesce(sum(price_output), 0),
+           {sign} * coalesce(sum(price_output - price_input), 0),
+           now()
+    FROM {rows}
+    WHERE deleted_at IS NULL
+    GROUP BY warehouse_id, status
+    ORDER BY warehouse_id, status
+    ON CONFLICT (warehouse_id, status{conflict_slot}) DO UPDATE SET
+        serial_numbers = s.serial_numbers + excluded.serial_numbers,
+        price_input = s.price_input + excluded.price_input,
+        price_output = s.price_output + excluded.price_output,
+        margin = s.margin + excluded.margin,
+        updated_at = excluded.updated_at;
+"""
+
+
+def apply_function(slotted: bool) -> str:
+    """The versioned stock_summary_apply of the stock_summary_versions migration; the slotted
+    one writes to the slot of the connection."""
+    slot = {
+        'slot_column': 'slot, ' if slotted else '',
+        'slot_value': f'pg_backend_pid() % {SLOTS},' if slotted else '',
+        'conflict_slot': ', slot' if slotted else '',
+    }
+    return f"""
+CREATE OR REPLACE FUNCTION stock_summary_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN DELETE FROM stock_summary; END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {APPLY_ROWS.format(sign=-1, rows='old_rows', **slot)}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {APPLY_ROWS.format(sign=1, rows='new_rows', **slot)}
+    END IF;
+    PERFORM nextval('stock_summary_applied_version');
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("LOCK TABLE serial_number IN SHARE MODE")
+    op.add_column('stock_summary', sa.Column('slot', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('stock_summary_pkey', 'stock_summary', type_='primary')
+    op.create_primary_key('stock_summary_pkey', 'stock_summary', ['warehouse_id', 'status', 'slot'])
+    op.execute(apply_function(slotted=True))
+    # the counters are read from stock_summary now, see Warehouse in orm_models
+    op.drop_column('warehouse', 'product_count_out')
+    op.drop_column('warehouse', 'product_count_in_stock')
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE serial_number IN SHARE MODE")
+    op.add_column('warehouse', sa.Column('product_count_in_stock', sa.Integer(), nullable=True))
+    op.add_column('warehouse', sa.Column('product_count_out', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE warehouse SET "
+        "product_count_in_stock = coalesce((SELECT sum(serial_numbers) FROM stock_summary "
+        "WHERE warehouse_id = warehouse.id AND status = 'WAREHOUSE'), 0), "
+        "product_count_out = coalesce((SELECT sum(serial_numbers) FROM stock_summary "
+        "WHERE warehouse_id = warehouse.id AND status <> 'WAREHOUSE'), 0) "
+        "WHERE deleted_at IS NULL"
+    )
+    # fold the slots into slot 0 before it becomes the only one
+    op.execute(
+        "WITH moved AS (DELETE FROM stock_summary WHERE slot <> 0 RETURNING *) "
+        "INSERT INTO stock_summary AS s "
+        "SELECT warehouse_id, status, sum(serial_numbers), sum(price_input), sum(price_output), "
+        "sum(margin), max(updated_at), 0 FROM moved GROUP BY warehouse_id, status "
+        "ON CONFLICT (warehouse_id, status, slot) DO UPDATE SET "
+        "serial_numbers = s.serial_numbers + excluded.serial_numbers, "
+        "price_input = s.price_input + excluded.price_input, "
+        "price_output = s.price_output + excluded.price_output, "
+        "margin = s.margin + excluded.margin, "
+        "updated_at = greatest(s.updated_at, excluded.updated_at)"
+    )
+    op.drop_constraint('stock_summary_pkey', 'stock_summary', type_='primary')
+    op.create_primary_key('stock_summary_pkey', 'stock_summary', ['warehouse_id', 'status'])
+    op.drop_column('stock_summary', 'slot')
+    op.execute(apply_function(slotted=False))
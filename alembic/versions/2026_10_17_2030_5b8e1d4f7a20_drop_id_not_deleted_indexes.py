@@ -0,0 +1,32 @@
+"""drop the partial id indexes of not deleted rows
+
+Revision ID: 5b8e1d4f7a20
+Revises: 7d4b2e9c1f63
+Create Date: 2026-10-17 20:30:16.402887
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1d4f7a20'
+down_revision: Union[str, None] = '7d4b2e9c1f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keyset pages select whole rows, so these can not make an index-only scan and the
+# primary key already serves `id > :after ORDER BY id`; they only cost writes.
+NOT_DELETED_TABLES = ('serial_number', 'warehouse', 'supplier', 'manufacturer')
+
+
+def upgrade() -> None:
+    for table in NOT_DELETED_TABLES:
+        op.drop_index(f'ix_{table}_id_not_deleted', table_name=table, postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    for table in NOT_DELETED_TABLES:
+        op.create_index(f'ix_{table}_id_not_deleted', table, ['id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
@@ -1,11 +1,26 @@
+from functools import cache
 from logging import getLogger
-from typing import Any
+from typing import Any, Callable
 
 from pydantic import BaseModel
 
 logger = getLogger(__name__)
 
 
+class ColumnOperator:
+    """Field map value applying `operator(column, value)` to every non-None filter value.
+
+    Unlike callables it is applied to falsy values too, so `price_input_to=0` still filters.
+    """
+
+    def __init__(self, column: Any, operator: Callable[[Any, Any], Any]) -> None:
+        self.column = column
+        self.operator = operator
+
+    def apply(self, value: Any) -> Any:
+        return self.operator(self.column, value)
+
+
 class FilterToQueryMapper:
     field_map: dict[str | tuple[str, ...], Any] = {}
     body_filters: BaseModel
@@ -16,29 +31,38 @@ class FilterToQueryMapper:
         self.context = context or {}
 
     def filter_params(self):
+        body_filters_dict = self.body_filters.model_dump()
         filter_list = []
-        for fields, field_map_value in self.field_map.items():
+        for fields, field_map_value in self._compile(type(self.body_filters)):
+            body_filters_values = [body_filters_dict[field] for field in fields]
+            filter_list += self._get_filter_list(body_filters_values, field_map_value)
+        return filter_list
+
+    @classmethod
+    @cache
+    def _compile(cls, filters_model: type[BaseModel]) -> tuple[tuple[tuple[str, ...], Any], ...]:
+        """Normalized field map entries valid for `filters_model`, built once per pair of classes."""
+        compiled = []
+        for fields, field_map_value in cls.field_map.items():
             if isinstance(fields, str):
                 fields = (fields,)
 
             if not all(
-                [field in self.body_filters.model_fields.keys() for field in fields],
+                [field in filters_model.model_fields.keys() for field in fields],
             ):
                 logger.warning(
-                    f"fields {fields} does not exists in model {self.body_filters.__class__.__name__}",
+                    f"fields {fields} does not exists in model {filters_model.__name__}",
                 )
                 continue
 
-            if not field_map_value:
+            if field_map_value is None:
                 logger.warning(
-                    f"field_map_value {field_map_value} for fields {fields} is falsy",
+                    f"field_map_value for fields {fields} is None",
                 )
                 continue
 
-            body_filters_dict = self.body_filters.model_dump()
-            body_filters_values = [body_filters_dict[field] for field in fields]
-            filter_list += self._get_filter_list(body_filters_values, field_map_value)
-        return filter_list
+            compiled.append((fields, field_map_value))
+        return tuple(compiled)
 
     def _get_filter_list(
         self,
@@ -60,7 +84,9 @@ class FilterToQueryMapper:
         for value in values:
             if value is None:
                 continue
-            if isinstance(value, list):
+            if isinstance(map_value, ColumnOperator):
+                filter_list.append(map_value.apply(value))
+            elif isinstance(value, list):
                 filter_list.append(map_value.in_(value))
             else:
                 filter_list.append(map_value == value)
@@ -20,6 +20,13 @@ class Settings(BaseSettings):
         "max_overflow": 3,
     }
 
+    EXCEL_IMPORT_CHUNK_SIZE: int = 1000
+    EXCEL_IMPORT_PROCESSES: int = 2
+    EXCEL_IMPORT_STALE_AFTER: int = 1800
+    EXCEL_IMPORT_HEARTBEAT: int = 60
+
+    FAST_JSON_RESPONSES: bool = True
+
     def __init__(self):
         super().__init__()
         self.POSTGRES_HOST = self.MS_WAREHOUSE_HOST
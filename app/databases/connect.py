@@ -8,4 +8,9 @@ metadata = MetaData()
 
 
 class Base(AsyncAttrs, DeclarativeBase):
+    # columns of the mapped models that BaseDAO builds queries with
     id: Any
+    name: Any
+    created_at: Any
+    updated_at: Any
+    deleted_at: Any
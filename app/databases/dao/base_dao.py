@@ -1,22 +1,40 @@
+import datetime
 from abc import ABC
+from enum import Enum
 from logging import Logger
-from typing import Any, Iterable, List, Literal, Optional, Type, TypeVar
+from typing import Any, AsyncIterator, Iterable, List, Literal, Optional, Sequence, Type, TypeVar
+from uuid import uuid4
 
 from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, text, update
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import (
+    JSON, Column, DateTime, Enum as SQLEnum, MetaData, String, Table, Text, case,
+    cast, delete, exists, insert, inspect, literal, null, select, text,
+    tuple_, union_all, update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import selectinload
-from sqlalchemy.sql import Select
+from sqlalchemy.sql import ColumnElement, Executable, Select
+from sqlalchemy.sql.schema import ColumnElementColumnDefault, ScalarElementColumnDefault
+from sqlalchemy.sql.visitors import ExternallyTraversible, replacement_traverse
 from sqlalchemy.sql.functions import func
 
 from app.databases.connect import Base
+from app.utils.serializers import nested_model
 
 Model = TypeVar("Model", bound="Base")
 BM = TypeVar("BM", bound=BaseModel)
 
 logger = Logger(__name__)
 
+UNIQUE_VIOLATION = "23505"
+
+
+def is_unique_violation(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == UNIQUE_VIOLATION
+
 
 class BaseDAO(ABC):
     model: Type[Base] = Base
@@ -40,6 +58,201 @@ class BaseDAO(ABC):
         results = q.scalars().all()
         return results
 
+    async def get_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        **kwargs: TKwargs,
+    ) -> tuple[list[Model] | Any, Optional[int]]:
+        """Keyset page ordered by id: rows with id > `after` and the cursor of the next page.
+
+        With `fields` only those columns (plus id) are selected and plain rows are returned.
+        """
+        where = list(kwargs.pop("where", None) or [])
+        if after is not None:
+            where.append(self.model.id > after)
+        kwargs.update(
+            where=where,
+            order_by=[self.model.id],
+            limit=limit + 1 if limit is not None else None,
+        )
+        if fields:
+            results = await self.get_rows(self.get_columns(fields), **kwargs)
+        else:
+            results = await self.get_list(**kwargs)
+        if limit is not None and len(results) > limit:
+            results = results[:limit]
+            return results, results[-1].id
+        return results, None
+
+    async def get_json_page(
+        self,
+        schema: Type[BaseModel],
+        include: Iterable[str] = (),
+        criteria: Optional[dict[str, Iterable]] = None,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        where: Optional[Iterable] = None,
+    ) -> tuple[bytes, Optional[int]]:
+        """Keyset page rendered by PostgreSQL as a JSON array shaped like `schema`.
+
+        Documents are built with row_to_json, whose compact output matches orjson, so no
+        ORM object or pydantic model is created. Relations not in `include` are null.
+        """
+        where = list(where or [])
+        if after is not None:
+            where.append(self.model.id > after)
+        page = self._construct_query(
+            select(*self._json_columns(self.model, schema, include, criteria or {})),
+            where=where,
+            order_by=[self.model.id],
+            limit=limit + 1 if limit is not None else None,
+        ).subquery("page")
+        q = await self.session.execute(
+            select(page.c.id, cast(func.row_to_json(page.table_valued()), Text)),
+        )
+        rows = q.all()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
+        return b"[" + b",".join(row[1].encode() for row in rows) + b"]", next_cursor
+
+    @classmethod
+    def _json_columns(
+        cls,
+        model: Any,
+        schema: Type[BaseModel],
+        include: Iterable[str] = (),
+        criteria: Optional[dict[str, Iterable]] = None,
+    ) -> list[Any]:
+        relationships = inspect(model).relationships
+        columns = []
+        for name, field in schema.model_fields.items():
+            nested = nested_model(field.annotation)
+            if nested is None:
+                column = getattr(model, name)
+                if isinstance(column.type, SQLEnum) and column.type.enum_class:
+                    # enums are stored by name but serialized by value
+                    column = case(
+                        {member.name: member.value for member in column.type.enum_class},
+                        value=cast(column, String),
+                    )
+                columns.append(column.label(name))
+                continue
+            if name not in include or name not in relationships:
+                columns.append(null().label(name))
+                continue
+            relationship = relationships[name]
+            related = (
+                select(*cls._json_columns(relationship.mapper.class_, nested[0]))
+                .where(relationship.primaryjoin, *(criteria or {}).get(name, ()))
+                .correlate(model)
+                .subquery(f"{name}_json")
+            )
+            document: ColumnElement[str] = cast(func.row_to_json(related.table_valued()), Text)
+            if relationship.uselist:
+                document = func.coalesce(
+                    literal("[")
+                    + func.string_agg(document, aggregate_order_by(literal(","), related.c.id))
+                    + literal("]"),
+                    literal("[]"),
+                )
+            columns.append(cast(select(document).scalar_subquery(), JSON).label(name))
+        return columns
+
+    async def stream_rows(
+        self,
+        select_: Iterable,
+        yield_per: int = 1000,
+        **kwargs: TKwargs,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yields row partitions of `yield_per` from a server-side cursor; needs an open transaction."""
+        query = self._construct_query(select(*select_), **kwargs).execution_options(yield_per=yield_per)
+        result = await self.session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+    def search_where(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> list[Any]:
+        """Filters shared by list endpoints: not deleted, optional id list and name substring."""
+        where = [self.model.deleted_at.is_(None)]
+        if need_id:
+            where.append(self.model.id.in_(need_id))
+        if search:
+            where.append(self.model.name.ilike(f"%{search}%"))
+        return where
+
+    async def get_validators(
+        self,
+        where: Iterable,
+        include: Optional[Iterable[str]] = None,
+    ) -> list[Row]:
+        """(count, last change as timestamptz, epoch sum of changes) of the filtered rows per source.
+
+        Included relations add a row for their targets referenced by the filtered rows. The
+        aggregates run in a single statement and no rows are loaded.
+        """
+        aggregates = []
+        for model, criteria, changed_at in self._validator_sources(list(where), include or []):
+            aggregates.append(
+                select(
+                    func.count(),
+                    # the columns hold local time of the session time zone, as now() wrote it
+                    cast(func.max(changed_at), DateTime(timezone=True)),
+                    func.sum(func.extract("epoch", changed_at)),
+                ).select_from(model).where(*criteria),
+            )
+        q = await self.session.execute(union_all(*aggregates))
+        return list(q.all())
+
+    def _validator_sources(self, where: list, include: Iterable[str]) -> list[tuple[Any, list, Any]]:
+        """(model, criteria, change time) of the rows whose changes the validators cover."""
+        relationships = inspect(self.model).relationships
+        sources = [(self.model, where)]
+        for name in include:
+            if name not in relationships:
+                raise ValueError(f"{self.model.__name__} has no relationship {name}")
+            relationship = relationships[name]
+            sources.append((
+                relationship.mapper.class_,
+                [
+                    remote.in_(select(local).where(*where))
+                    for local, remote in relationship.local_remote_pairs or ()
+                ],
+            ))
+        return [
+            (model, criteria, func.coalesce(model.updated_at, model.created_at))
+            for model, criteria in sources
+        ]
+
+    async def get_rows(
+        self,
+        select_: Iterable,
+        **kwargs: TKwargs,
+    ) -> list[Row]:
+        query = self._construct_query(select(*select_), **kwargs)
+        q = await self.session.execute(query)
+        return list(q.all())
+
+    @classmethod
+    def get_columns(cls, fields: Iterable[str]) -> list[Any]:
+        """Model columns for `fields`, always starting with id; deferred columns are not selectable."""
+        columns = {
+            attribute.key: getattr(cls.model, attribute.key)
+            for attribute in inspect(cls.model).column_attrs
+            if not attribute.deferred
+        }
+        names = ["id", *[field for field in fields if field != "id"]]
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            raise ValueError(f"{cls.model.__name__} has no fields {unknown}")
+        return [columns[name] for name in dict.fromkeys(names)]
+
     async def get_selected_list(
         self,
         select_: Iterable,
@@ -131,6 +344,91 @@ class BaseDAO(ABC):
             raise
         return await self.get_item_by_id(item_id, **kwargs)  # type: ignore[func-returns-value]
 
+    @classmethod
+    def returning_columns(cls) -> list[Any]:
+        """Every column except deferred ones (e.g. search_vector), for RETURNING."""
+        return [
+            getattr(cls.model, attribute.key)
+            for attribute in inspect(cls.model).column_attrs
+            if not attribute.deferred
+        ]
+
+    async def insert_returning(
+        self,
+        item: BM | dict[str, Any],
+        unless_exists: Optional[Iterable] = None,
+    ) -> Optional[Row]:
+        """INSERT ... RETURNING in one round trip.
+
+        With `unless_exists` it is INSERT ... SELECT ... WHERE NOT EXISTS (those conditions)
+        ON CONFLICT DO NOTHING, and None is returned when such a row is already there. The
+        ON CONFLICT covers a concurrent insert of the same row that NOT EXISTS can not see.
+        """
+        if isinstance(item, BaseModel):
+            item = item.model_dump()
+        if unless_exists:
+            columns = {column.key: column for column in self.model.__table__.columns}
+            query = pg_insert(self.model).from_select(
+                list(item),
+                select(*[literal(value, columns[key].type) for key, value in item.items()])
+                .where(~exists().where(*unless_exists)),
+            ).on_conflict_do_nothing()
+        else:
+            query = pg_insert(self.model).values(**item)
+        returning = self.returning_columns()
+        table = self._table()
+        table_columns = table.columns
+        statement: Executable
+        if any(column.key not in table_columns for column in returning):
+            # an INSERT does not correlate subqueries in RETURNING, so the column_property
+            # expressions (the warehouse stock counters) are selected over the inserted row
+            inserted = query.returning(*[column for column in returning if column.key in table_columns]).cte()
+
+            def from_inserted(element: ExternallyTraversible, **kw: Any) -> Optional[ExternallyTraversible]:
+                if isinstance(element, Column) and element.table is table:
+                    return inserted.c[element.key]
+                return None
+
+            statement = select(*[
+                inserted.c[column.key] if column.key in table_columns
+                else replacement_traverse(column.expression, {}, from_inserted).label(column.key)
+                for column in returning
+            ])
+        else:
+            statement = query.returning(*returning)
+        try:
+            q = await self.session.execute(statement)
+        except SQLAlchemyError as exc:
+            logger.error(exc.args)
+            raise
+        return q.one_or_none()
+
+    async def update_returning(
+        self,
+        item_id: int,
+        item: BM | dict[str, Any],
+        exclude_none: bool = True,
+    ) -> Optional[Row]:
+        """UPDATE ... WHERE id = :id AND deleted_at IS NULL RETURNING in one round trip.
+
+        None means there is no such live row.
+        """
+        if isinstance(item, BaseModel):
+            item = item.model_dump(exclude_none=exclude_none)
+        where = [self.model.id == item_id, self.model.deleted_at.is_(None)]
+        returning = self.returning_columns()
+        if not item:
+            q = await self.session.execute(select(*returning).where(*where))
+            return q.one_or_none()
+        try:
+            q = await self.session.execute(
+                update(self.model).where(*where).values(**item).returning(*returning),
+            )
+        except SQLAlchemyError as exc:
+            logger.error(exc.args)
+            raise
+        return q.one_or_none()
+
     async def _upd_sequence(self):
         query = await self.session.execute(select(func.max(self.model.id)))
         max_id_seq = query.scalar()
@@ -151,17 +449,220 @@ class BaseDAO(ABC):
             logger.error(exc.args)
             raise
 
-    async def insert_bulk(self, items: List[dict]) -> bool:
+    async def insert_bulk(
+        self,
+        items: List[dict],
+        returning: Optional[Iterable] = None,
+    ) -> bool | list[Any]:
+        """executemany INSERT; with `returning` the rows come back in the order of `items`."""
+        if not items:
+            return [] if returning else False
+        query = insert(self.model)
+        if returning:
+            query = query.returning(*returning, sort_by_parameter_order=True)
+        try:
+            q = await self.session.execute(query, items)
+            await self.session.flush()
+        except SQLAlchemyError as exc:
+            logger.error(exc.args)
+            raise
+        return list(q.all()) if returning else True
+
+    async def lock_live_rows(self, item_ids: Iterable[int]) -> list[Row]:
+        """SELECT id ... FOR UPDATE of the not deleted rows among `item_ids`."""
+        q = await self.session.execute(
+            select(self.model.id)
+            .where(self.model.id.in_(list(item_ids)), self.model.deleted_at.is_(None))
+            .with_for_update(),
+        )
+        return list(q.all())
+
+    async def get_live_keys(self, fields: Iterable[str], keys: Iterable[tuple]) -> set[tuple]:
+        """Which of the `fields` value tuples already belong to not deleted rows."""
+        keys = list(keys)
+        if not keys:
+            return set()
+        columns = [getattr(self.model, name) for name in fields]
+        q = await self.session.execute(
+            select(*columns).where(tuple_(*columns).in_(keys), self.model.deleted_at.is_(None)),
+        )
+        return {tuple(row) for row in q.all()}
+
+    @classmethod
+    def reference_fields(cls) -> list[str]:
+        """The foreign key columns of the model, e.g. supplier_id of a warehouse."""
+        return [column.key for column in cls._table().columns if column.foreign_keys]
+
+    async def get_live_references(self, ids: dict[str, set[int]]) -> dict[str, set[int]]:
+        """Which of the ids of each reference field point at not deleted rows.
+
+        They are locked FOR KEY SHARE, so they cannot be removed before the caller's insert.
+        """
+        live = {}
+        for field, field_ids in ids.items():
+            (foreign_key,) = self._table().columns[field].foreign_keys
+            referenced = foreign_key.column
+            q = await self.session.execute(
+                select(referenced)
+                .where(referenced.in_(list(field_ids)), referenced.table.c.deleted_at.is_(None))
+                .with_for_update(read=True, key_share=True),
+            )
+            live[field] = set(q.scalars().all())
+        return live
+
+    async def soft_delete_bulk(self, item_ids: Iterable[int]) -> list[Row]:
+        """Marks the not deleted rows among `item_ids` deleted; returns the id of each."""
+        try:
+            q = await self.session.execute(
+                update(self.model)
+                .where(self.model.id.in_(list(item_ids)), self.model.deleted_at.is_(None))
+                .values(deleted_at=datetime.datetime.now())
+                .returning(self.model.id),
+            )
+        except SQLAlchemyError as exc:
+            logger.error(exc.args)
+            raise
+        return list(q.all())
+
+    async def upsert_bulk(
+        self,
+        items: List[dict],
+        index_elements: Iterable[str],
+        index_where: Optional[Any] = None,
+        update_columns: Optional[Iterable[str]] = None,
+        returning: Optional[Iterable] = None,
+    ) -> list[Any]:
+        """INSERT ... ON CONFLICT in one statement.
+
+        Conflicting rows are skipped unless `update_columns` is given, in which case
+        they are updated from `excluded` and also show up in `returning`; without
+        `returning` an empty list is returned.
+        """
+        if not items:
+            return []
+        query = pg_insert(self.model)
+        if update_columns:
+            query = query.on_conflict_do_update(
+                index_elements=list(index_elements),
+                index_where=index_where,
+                set_={column: query.excluded[column] for column in update_columns},
+            )
+        else:
+            query = query.on_conflict_do_nothing(
+                index_elements=list(index_elements),
+                index_where=index_where,
+            )
+        statement = query.returning(*returning) if returning else query
+        try:
+            q = await self.session.execute(statement, items)
+            await self.session.flush()
+        except SQLAlchemyError as exc:
+            logger.error(exc.args)
+            raise
+        return list(q.all()) if returning else []
+
+    async def copy_insert_bulk(
+        self,
+        items: List[dict],
+        index_elements: Optional[Iterable[str]] = None,
+        index_where: Optional[Any] = None,
+    ) -> bool:
+        """Bulk insert through COPY into a staging table and one INSERT ... SELECT.
+
+        Insert-or-skip only: with `index_elements` rows conflicting with that unique index
+        are skipped, never updated; upserts go through `upsert_bulk`.
+        """
         if not items:
             return False
         try:
-            await self.session.execute(insert(self.model), items)
+            staging, columns = await self._copy_to_staging(items)
+            query = self._insert_from_staging(staging, columns)
+            if index_elements:
+                query = query.on_conflict_do_nothing(
+                    index_elements=list(index_elements),
+                    index_where=index_where,
+                )
+            await self.session.execute(query)
+            await self.session.execute(text(f"DROP TABLE {staging.name}"))
             await self.session.flush()
             return True
         except SQLAlchemyError as exc:
             logger.error(exc.args)
             raise
 
+    @classmethod
+    def _table(cls) -> Table:
+        table = cls.model.__table__
+        if not isinstance(table, Table):
+            raise TypeError(f"{cls.model.__name__} is not mapped to a table")
+        return table
+
+    async def _copy_to_staging(self, items: List[dict]) -> tuple[Table, list[str]]:
+        table = self._table()
+        columns = list(items[0].keys())
+        staging = Table(
+            f"{table.name}_staging_{uuid4().hex[:8]}",
+            MetaData(),
+            *[Column(column, table.c[column].type) for column in columns],
+        )
+        await self.session.execute(
+            text(
+                f"CREATE TEMP TABLE {staging.name} ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {table.name} WITH NO DATA",
+            ),
+        )
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        if driver_connection is None:
+            raise SQLAlchemyError("COPY needs an open asyncpg connection")
+        await driver_connection.copy_records_to_table(
+            staging.name,
+            records=[
+                tuple(
+                    value.name if isinstance(value, Enum) else value
+                    for value in (item.get(column) for column in columns)
+                )
+                for item in items
+            ],
+            columns=columns,
+        )
+        return staging, columns
+
+    def _insert_from_staging(self, staging: Table, columns: list[str]):
+        table = self._table()
+        defaults = []
+        for column in table.columns:
+            default = column.default
+            if column.name in columns:
+                continue
+            if isinstance(default, ColumnElementColumnDefault):
+                defaults.append(default.arg.label(column.name))
+            elif isinstance(default, ScalarElementColumnDefault):
+                defaults.append(literal(default.arg, column.type).label(column.name))
+        return pg_insert(table).from_select(
+            [*columns, *[default.name for default in defaults]],
+            select(*[staging.c[column] for column in columns], *defaults),
+        )
+
+    @classmethod
+    def relation_loaders(
+        cls,
+        include: Iterable[str],
+        criteria: Optional[dict[str, Iterable]] = None,
+    ) -> list[Any]:
+        """Relationship attributes for `select_in_load`, with optional per-relation loader criteria."""
+        relationships = inspect(cls.model).relationships
+        loaders = []
+        for name in include:
+            if name not in relationships:
+                raise ValueError(f"{cls.model.__name__} has no relationship {name}")
+            attribute = getattr(cls.model, name)
+            if criteria and criteria.get(name):
+                attribute = attribute.and_(*criteria[name])
+            loaders.append(attribute)
+        return loaders
+
     @staticmethod
     def _construct_query(
         query: Select,
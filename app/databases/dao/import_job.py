@@ -0,0 +1,49 @@
+import datetime
+from typing import Any
+
+from sqlalchemy import func, update
+
+from app.databases.dao.base_dao import BaseDAO
+from app.models import ImportJob, ImportJobStatusEnum
+
+UNFINISHED_STATUSES = (
+    ImportJobStatusEnum.PENDING,
+    ImportJobStatusEnum.PARSING,
+    ImportJobStatusEnum.IMPORTING,
+)
+
+
+class ImportJobDAO(BaseDAO):
+    model = ImportJob
+
+    async def update_unfinished(self, item_id: int, values: dict[str, Any]) -> bool:
+        """Writes `values` to the job only while it is unfinished, False once it is not."""
+        q = await self.session.execute(
+            update(self.model)
+            .where(
+                self.model.id == item_id,
+                self.model.status.in_(UNFINISHED_STATUSES),
+            )
+            .values(**values),
+        )
+        return bool(q.rowcount)
+
+    async def fail_stale(self, stale_after: datetime.timedelta, error: str) -> int:
+        """Marks FAILED every unfinished job that has not reported progress for `stale_after`.
+
+        Every status, progress or heartbeat write bumps updated_at, so a job that stopped
+        moving was lost with the process that ran it.
+        """
+        q = await self.session.execute(
+            update(self.model)
+            .where(
+                self.model.status.in_(UNFINISHED_STATUSES),
+                func.coalesce(self.model.updated_at, self.model.created_at) < func.now() - stale_after,
+            )
+            .values(
+                status=ImportJobStatusEnum.FAILED,
+                finished_at=func.now(),
+                error=error,
+            ),
+        )
+        return q.rowcount
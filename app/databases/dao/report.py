@@ -0,0 +1,184 @@
+import datetime
+from typing import Any, Iterable
+
+from sqlalchemy import Integer, case, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import array
+
+from app.databases.dao.base_dao import BaseDAO
+from app.models import Manufacturer, SerialNumber, SerialNumberStatusEnum, Supplier, Warehouse
+
+ReportGroup = Warehouse | Supplier | Manufacturer
+
+REPORT_GROUPS: dict[str, type[ReportGroup]] = {
+    "warehouse": Warehouse,
+    "supplier": Supplier,
+    "manufacturer": Manufacturer,
+}
+
+
+class ReportDAO(BaseDAO):
+    model = SerialNumber
+
+    async def stock_summary(
+        self,
+        group_by: str,
+        where: Iterable | None = None,
+    ) -> list[Any]:
+        """Serial number totals per group in a single GROUP BY; per-status counts use FILTER.
+
+        Status count columns are labelled by the enum member name.
+        """
+        group_model = REPORT_GROUPS[group_by]
+        sold = self.model.price_output.is_not(None)
+        query = select(
+            group_model.id.label("id"),
+            group_model.name.label("name"),
+            func.count().label("serial_numbers"),
+            *[
+                func.count().filter(self.model.status == member).label(member.name)
+                for member in SerialNumberStatusEnum
+            ],
+            func.coalesce(func.sum(self.model.price_input), 0).label("price_input"),
+            func.coalesce(func.sum(self.model.price_output), 0).label("price_output"),
+            func.coalesce(
+                func.sum(self.model.price_output - self.model.price_input).filter(sold),
+                0,
+            ).label("margin"),
+        ).select_from(self.model)
+        join: list[type[ReportGroup]] = [Warehouse]
+        if group_model is not Warehouse:
+            join.append(group_model)
+        query = self._construct_query(
+            query,
+            join=join,
+            where=[
+                self.model.deleted_at.is_(None),
+                Warehouse.deleted_at.is_(None),
+                *(where or []),
+            ],
+            group_by=[group_model.id],
+            order_by=[group_model.id],
+        )
+        q = await self.session.execute(query)
+        return list(q.all())
+
+    async def aging(
+        self,
+        bounds: list[int],
+        where: Iterable | None = None,
+    ) -> list[Any]:
+        """In-stock serial numbers per days-in-stock bucket with their share of the total.
+
+        `bucket` is width_bucket over the ascending `bounds`: 0 is below the first bound.
+        """
+        days = func.current_date() - self.model.data_input
+        bucket = func.width_bucket(days, array(bounds, type_=Integer)).label("bucket")
+        count = func.count()
+        query = self._construct_query(
+            select(
+                bucket,
+                count.label("serial_numbers"),
+                func.coalesce(func.sum(self.model.price_input), 0).label("price_input"),
+                (count * 1.0 / func.sum(count).over()).label("share"),
+            ),
+            where=[
+                self.model.deleted_at.is_(None),
+                self.model.status == SerialNumberStatusEnum.WAREHOUSE,
+                *(where or []),
+            ],
+            group_by=[bucket],
+            order_by=[bucket],
+        )
+        q = await self.session.execute(query)
+        return list(q.all())
+
+    async def turnover(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+        where: Iterable | None = None,
+    ) -> list[Any]:
+        """Monthly received/shipped/sold counts with a running stock level and sell-through.
+
+        Incoming and outgoing events are range scans on data_input and data_output; the
+        stock at the end of each month is the opening stock plus a running window sum.
+        """
+        where = [self.model.deleted_at.is_(None), *(where or [])]
+        sold = self.model.status == SerialNumberStatusEnum.SOLD
+        events = union_all(
+            select(
+                func.date_trunc("month", self.model.data_input).label("month"),
+                literal(1).label("received"),
+                literal(0).label("shipped"),
+                literal(0).label("sold"),
+                literal(0).label("revenue"),
+            ).where(*where, self.model.data_input.between(date_from, date_to)),
+            select(
+                func.date_trunc("month", self.model.data_output).label("month"),
+                literal(0).label("received"),
+                literal(1).label("shipped"),
+                case((sold, 1), else_=0).label("sold"),
+                case((sold, func.coalesce(self.model.price_output, 0)), else_=0).label("revenue"),
+            ).where(*where, self.model.data_output.between(date_from, date_to)),
+        ).subquery()
+        opening_stock = (
+            select(func.count())
+            .where(
+                *where,
+                self.model.data_input < date_from,
+                (self.model.data_output.is_(None)) | (self.model.data_output >= date_from),
+            )
+            .scalar_subquery()
+        )
+        received = func.sum(events.c.received)
+        shipped = func.sum(events.c.shipped)
+        sold_count = func.sum(events.c.sold)
+        stock_end = opening_stock + func.sum(received - shipped).over(order_by=events.c.month)
+        q = await self.session.execute(
+            select(
+                events.c.month,
+                received.label("received"),
+                shipped.label("shipped"),
+                sold_count.label("sold"),
+                func.sum(events.c.revenue).label("revenue"),
+                stock_end.label("stock_end"),
+                # stock at the start of the month plus what came in equals stock_end + shipped
+                (sold_count * 1.0 / func.nullif(stock_end + shipped, 0)).label("sell_through"),
+            )
+            .group_by(events.c.month)
+            .order_by(events.c.month),
+        )
+        return list(q.all())
+
+    async def slow_movers(
+        self,
+        min_days: int,
+        limit: int,
+        where: Iterable | None = None,
+    ) -> list[Any]:
+        """Warehouses whose oldest in-stock serial number is at least `min_days` old, ranked by age."""
+        in_stock = self.model.status == SerialNumberStatusEnum.WAREHOUSE
+        days = func.current_date() - self.model.data_input
+        oldest_days = func.max(days).filter(in_stock)
+        query = self._construct_query(
+            select(
+                Warehouse.id.label("id"),
+                Warehouse.name.label("name"),
+                func.count().filter(in_stock).label("in_stock"),
+                oldest_days.label("oldest_days"),
+                func.avg(days).filter(in_stock).label("average_days"),
+                func.max(self.model.data_output).label("last_output"),
+                func.rank().over(order_by=oldest_days.desc()).label("rank"),
+            ).select_from(self.model),
+            join=[Warehouse],
+            where=[
+                self.model.deleted_at.is_(None),
+                Warehouse.deleted_at.is_(None),
+                *(where or []),
+            ],
+            group_by=[Warehouse.id],
+            order_by=[oldest_days.desc(), Warehouse.id],
+            limit=limit,
+        ).having(oldest_days >= min_days)
+        q = await self.session.execute(query)
+        return list(q.all())
@@ -0,0 +1,54 @@
+from typing import Any, Iterable
+
+from sqlalchemy import func, literal, select, union_all
+
+from app.databases.dao.base_dao import BaseDAO
+from app.models import SEARCH_CONFIG, Manufacturer, SerialNumber, Supplier, Warehouse
+
+SearchModel = Warehouse | SerialNumber | Supplier | Manufacturer
+
+SEARCH_MODELS: dict[str, type[SearchModel]] = {
+    "warehouse": Warehouse,
+    "serial_number": SerialNumber,
+    "supplier": Supplier,
+    "manufacturer": Manufacturer,
+}
+
+
+class SearchDAO(BaseDAO):
+    async def search(
+        self,
+        query: str,
+        entities: Iterable[str] | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[Any]:
+        """Ranked full-text hits over every searchable table in one UNION ALL query."""
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        selects = []
+        for entity, model in SEARCH_MODELS.items():
+            if entities and entity not in entities:
+                continue
+            rank = func.ts_rank(model.search_vector, ts_query)
+            selects.append(
+                select(
+                    literal(entity).label("entity"),
+                    model.id.label("id"),
+                    model.name.label("name"),
+                    rank.label("rank"),
+                )
+                .where(
+                    model.search_vector.op("@@")(ts_query),
+                    model.deleted_at.is_(None),
+                )
+                .order_by(rank.desc())
+                .limit(offset + limit),
+            )
+        hits = union_all(*selects).subquery()
+        q = await self.session.execute(
+            select(hits)
+            .order_by(hits.c.rank.desc(), hits.c.entity, hits.c.id)
+            .limit(limit)
+            .offset(offset),
+        )
+        return list(q.all())
@@ -1,6 +1,61 @@
+from typing import Any
+
+from sqlalchemy import String, any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
 from app.databases.dao.base_dao import BaseDAO
-from app.models import SerialNumber
+from app.models import SerialNumber, SerialNumberStatusEnum
 
 
 class SerialNumberDAO(BaseDAO):
-    model = SerialNumber
\ No newline at end of file
+    model = SerialNumber
+
+    async def allocate(
+        self,
+        warehouse_id: int,
+        count: int,
+        values: dict[str, Any],
+    ) -> list[Any]:
+        """Moves up to `count` in-stock serial numbers of a warehouse out of stock with `values`.
+
+        Oldest first; rows locked by concurrent allocations are skipped instead of waited
+        for, so parallel orders pick disjoint rows. One UPDATE ... FROM (SELECT ... FOR
+        UPDATE SKIP LOCKED LIMIT n) RETURNING statement.
+        """
+        picked = (
+            select(self.model.id)
+            .where(
+                self.model.warehouse_id == warehouse_id,
+                self.model.status == SerialNumberStatusEnum.WAREHOUSE,
+                self.model.deleted_at.is_(None),
+            )
+            .order_by(self.model.data_input, self.model.id)
+            .limit(count)
+            .with_for_update(skip_locked=True)
+            .cte("picked")
+        )
+        q = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == picked.c.id)
+            .values(data_output=func.current_date(), **values)
+            .returning(*self.returning_columns()),
+        )
+        return list(q.all())
+
+    async def lookup(self, names: list[str]) -> list[Any]:
+        """Live serial numbers with exactly these names, one `name = ANY(:names)` probe of
+        the unique name index."""
+        q = await self.session.execute(
+            select(
+                self.model.id,
+                self.model.name,
+                self.model.warehouse_id,
+                self.model.status,
+                self.model.price_input,
+                self.model.price_output,
+            ).where(
+                self.model.name == any_(bindparam("names", names, type_=ARRAY(String))),
+                self.model.deleted_at.is_(None),
+            ),
+        )
+        return list(q.all())
@@ -0,0 +1,105 @@
+from typing import Any, Iterable
+
+from sqlalchemy import delete, func, insert, literal_column, select, text
+
+from app.databases.dao.base_dao import BaseDAO
+from app.models import SerialNumber, SerialNumberStatusEnum, StockSummary, Warehouse
+
+# sequences bumped by the serial_number statement triggers, see the stock_summary_versions migration
+SOURCE_VERSION = "stock_summary_source_version"
+APPLIED_VERSION = "stock_summary_applied_version"
+
+
+class StockSummaryDAO(BaseDAO):
+    model = StockSummary
+
+    async def get_warehouse_totals(self, where: Iterable | None = None) -> list[Any]:
+        """Same columns as ReportDAO.stock_summary grouped by warehouse, read from the summary table."""
+        query = select(
+            Warehouse.id.label("id"),
+            Warehouse.name.label("name"),
+            func.sum(self.model.serial_numbers).label("serial_numbers"),
+            *[
+                func.coalesce(
+                    func.sum(self.model.serial_numbers).filter(self.model.status == member),
+                    0,
+                ).label(member.name)
+                for member in SerialNumberStatusEnum
+            ],
+            func.sum(self.model.price_input).label("price_input"),
+            func.sum(self.model.price_output).label("price_output"),
+            func.sum(self.model.margin).label("margin"),
+        ).select_from(self.model)
+        query = self._construct_query(
+            query,
+            join=[Warehouse],
+            where=[
+                Warehouse.deleted_at.is_(None),
+                *(where or []),
+            ],
+            group_by=[Warehouse.id],
+            order_by=[Warehouse.id],
+        )
+        # a slot row can be negative, only the sum over the slots is the warehouse total
+        q = await self.session.execute(query.having(func.sum(self.model.serial_numbers) > 0))
+        return list(q.all())
+
+    async def get_refresh_state(self) -> Any:
+        """Last change applied to the summary and the statement counters of the triggers.
+
+        source_version counts write statements on serial_number, applied_version the ones
+        folded into the summary; they differ only when the apply triggers were bypassed.
+        Reads two sequences and the small summary table, serial_number is not scanned.
+        """
+        q = await self.session.execute(
+            select(
+                select(func.max(self.model.updated_at)).scalar_subquery().label("refreshed_at"),
+                self._sequence_value(SOURCE_VERSION).label("source_version"),
+                self._sequence_value(APPLIED_VERSION).label("applied_version"),
+            ),
+        )
+        return q.one()
+
+    @staticmethod
+    def _sequence_value(sequence: str) -> Any:
+        return func.coalesce(func.pg_sequence_last_value(literal_column(f"'{sequence}'::regclass")), 0)
+
+    async def rebuild(self, warehouse_ids: list[int] | None = None) -> int:
+        """Recomputes the summary of `warehouse_ids` (all warehouses by default) from serial_number
+        after the triggers were bypassed; a full rebuild marks every statement so far as applied."""
+        # writers wait until the rebuild commits, so no trigger delta is lost or counted twice
+        await self.session.execute(text("LOCK TABLE serial_number IN SHARE MODE"))
+        summary_where, source_where = [], [SerialNumber.deleted_at.is_(None)]
+        if warehouse_ids is not None:
+            summary_where.append(self.model.warehouse_id.in_(warehouse_ids))
+            source_where.append(SerialNumber.warehouse_id.in_(warehouse_ids))
+        await self.session.execute(delete(self.model).where(*summary_where))
+        q = await self.session.execute(
+            insert(self.model).from_select(
+                [
+                    "warehouse_id",
+                    "status",
+                    "serial_numbers",
+                    "price_input",
+                    "price_output",
+                    "margin",
+                    "updated_at",
+                ],
+                select(
+                    SerialNumber.warehouse_id,
+                    SerialNumber.status,
+                    func.count(),
+                    func.coalesce(func.sum(SerialNumber.price_input), 0),
+                    func.coalesce(func.sum(SerialNumber.price_output), 0),
+                    func.coalesce(func.sum(SerialNumber.price_output - SerialNumber.price_input), 0),
+                    func.now(),
+                )
+                .where(*source_where)
+                .group_by(SerialNumber.warehouse_id, SerialNumber.status),
+            ),
+        )
+        if warehouse_ids is None:
+            await self.session.execute(
+                text(f"SELECT setval('{APPLIED_VERSION}', last_value, is_called) FROM {SOURCE_VERSION}"),
+            )
+        return q.rowcount
@@ -1,19 +1,100 @@
+import datetime
+import hashlib
 import secrets
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, Annotated
+from email.utils import format_datetime
+from typing import Any, AsyncGenerator, Annotated, Iterable
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, HTTPBasicCredentials, HTTPBasic
 from httpx import AsyncClient, ConnectError, ConnectTimeout
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.utils.engine import Engine
+from app.utils.serializers import dump_trusted
 
 token_auth_scheme = HTTPBearer()
 
 security = HTTPBasic()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PAGE_SIZE = 100
+PAGE_SIZE_MAX = 1000
+
+
+class ConditionalGet:
+    def __init__(self, request: Request, response: Response) -> None:
+        self.request = request
+        self.response = response
+
+    def evaluate(self, validators: Iterable[Row]) -> Response | None:
+        """Sets ETag/Last-Modified from the validators, returns a 304 if the client is up to date.
+
+        The ETag also covers the path and query string, so every filter, page and projection
+        gets its own tag. Only If-None-Match can produce a 304: Last-Modified has one second
+        resolution and max(updated_at) does not move when rows leave the set, so
+        If-Modified-Since can not prove that the client is up to date and is ignored.
+        """
+        validators = list(validators)
+        state = f"{self.request.url.path}?{self.request.url.query}|{validators}"
+        etag = f'W/"{hashlib.sha1(state.encode()).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        changes = [row[1] for row in validators if row[1] is not None]
+        if changes:
+            last_modified = max(changes).astimezone(datetime.timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified.replace(microsecond=0), usegmt=True)
+        self.response.headers.update(headers)
+
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is None:
+            return None
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+
+class KeysetPagination:
+    def __init__(
+        self,
+        response: Response,
+        limit: int = Query(PAGE_SIZE, ge=1, le=PAGE_SIZE_MAX),
+        after: int | None = Query(None, ge=0),
+    ) -> None:
+        self.response = response
+        self.limit = limit
+        self.after = after
+
+    def paginate(
+        self,
+        page: tuple[list[Any] | bytes, int | None],
+        model: type[BaseModel] | None = None,
+    ) -> list[Any] | Response:
+        """Sets the next cursor header, keeping headers other dependencies set on the response.
+
+        Pages already rendered to JSON bytes by the database are sent as is. Projected rows,
+        and with FAST_JSON_RESPONSES entities dumped through `model`, are encoded straight
+        to orjson. Both skip response_model validation.
+        """
+        items, next_cursor = page
+        if next_cursor is not None:
+            self.response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+        headers = dict(self.response.headers)
+        if isinstance(items, bytes):
+            return Response(content=items, media_type="application/json", headers=headers)
+        if items and isinstance(items[0], Row):
+            return ORJSONResponse(
+                content=[item._asdict() for item in items],
+                headers=headers,
+            )
+        if model is not None and settings.FAST_JSON_RESPONSES:
+            return ORJSONResponse(content=dump_trusted(model, items), headers=headers)
+        return items
+
 
 async def get_db() -> AsyncGenerator:
     db = AsyncSession(
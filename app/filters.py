@@ -0,0 +1,65 @@
+import operator
+
+from app.common import ColumnOperator, FilterToQueryMapper
+from app.models import Manufacturer, SerialNumber, Supplier, Warehouse
+
+
+def _contains(column, value):
+    return column.ilike(f"%{value}%")
+
+
+class ManufacturerFilterMapper(FilterToQueryMapper):
+    field_map = {
+        "id": Manufacturer.id,
+        "name": ColumnOperator(Manufacturer.name, _contains),
+        "country": Manufacturer.country,
+        "created_from": ColumnOperator(Manufacturer.created_at, operator.ge),
+        "created_to": ColumnOperator(Manufacturer.created_at, operator.le),
+    }
+
+
+class SupplierFilterMapper(FilterToQueryMapper):
+    field_map = {
+        "id": Supplier.id,
+        "name": ColumnOperator(Supplier.name, _contains),
+        "country": Supplier.country,
+        "email": ColumnOperator(Supplier.email, _contains),
+        "created_from": ColumnOperator(Supplier.created_at, operator.ge),
+        "created_to": ColumnOperator(Supplier.created_at, operator.le),
+    }
+
+
+class WarehouseFilterMapper(FilterToQueryMapper):
+    field_map = {
+        "id": Warehouse.id,
+        "name": ColumnOperator(Warehouse.name, _contains),
+        "article": Warehouse.article,
+        "manufacturer_id": Warehouse.manufacturer_id,
+        "supplier_id": Warehouse.supplier_id,
+        "warranty_from": ColumnOperator(Warehouse.warranty, operator.ge),
+        "warranty_to": ColumnOperator(Warehouse.warranty, operator.le),
+        "in_stock_from": ColumnOperator(Warehouse.product_count_in_stock, operator.ge),
+        "in_stock_to": ColumnOperator(Warehouse.product_count_in_stock, operator.le),
+        "created_from": ColumnOperator(Warehouse.created_at, operator.ge),
+        "created_to": ColumnOperator(Warehouse.created_at, operator.le),
+    }
+
+
+class SerialNumberFilterMapper(FilterToQueryMapper):
+    field_map = {
+        "id": SerialNumber.id,
+        "name": ColumnOperator(SerialNumber.name, _contains),
+        "warehouse_id": SerialNumber.warehouse_id,
+        "status": SerialNumber.status,
+        "price_input_from": ColumnOperator(SerialNumber.price_input, operator.ge),
+        "price_input_to": ColumnOperator(SerialNumber.price_input, operator.le),
+        "price_output_from": ColumnOperator(SerialNumber.price_output, operator.ge),
+        "price_output_to": ColumnOperator(SerialNumber.price_output, operator.le),
+        "data_input_from": ColumnOperator(SerialNumber.data_input, operator.ge),
+        "data_input_to": ColumnOperator(SerialNumber.data_input, operator.le),
+        "data_output_from": ColumnOperator(SerialNumber.data_output, operator.ge),
+        "data_output_to": ColumnOperator(SerialNumber.data_output, operator.le),
+        "employee_id": SerialNumber.employee_id,
+        "buyer_id": SerialNumber.buyer_id,
+        "order_id": SerialNumber.order_id,
+    }
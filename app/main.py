@@ -1,11 +1,27 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+
+from app.depends import NEXT_CURSOR_HEADER
+from app.routers import manufacturer, report, search, supplier, warehouse, serial_number
+from app.services.import_job import ImportJobService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweep = asyncio.create_task(ImportJobService.sweep_stale_jobs())
+    yield
+    sweep.cancel()
 
-from app.routers import manufacturer, supplier, warehouse, serial_number
 
 app = FastAPI(
     title="Warehouse",
     version="0.0.1",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -14,12 +30,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(supplier.router)
 app.include_router(manufacturer.router)
 app.include_router(warehouse.router)
 app.include_router(serial_number.router)
+app.include_router(search.router)
+app.include_router(report.router)
 
 
 @app.get('/')
@@ -1,10 +1,14 @@
 import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import BigInteger, Computed, ForeignKey, Index, Integer, SmallInteger, func, select, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, MappedSQLExpression, column_property, mapped_column, relationship
 
 from app.databases.connect import Base
-from app.models.types import SerialNumberStatusEnum
+from app.models.types import ImportJobStatusEnum, SerialNumberStatusEnum
+
+SEARCH_CONFIG = "simple"
 
 
 class BaseClass:
@@ -19,6 +23,41 @@ class BaseClass:
 
 class SerialNumber(BaseClass, Base):
     __tablename__ = "serial_number"
+    __table_args__ = (
+        Index(
+            "ux_serial_number_name",
+            "name",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_serial_number_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_serial_number_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_serial_number_warehouse_status_data_input",
+            "warehouse_id",
+            "status",
+            "data_input",
+        ),
+        Index(
+            "ix_serial_number_data_input_brin",
+            "data_input",
+            postgresql_using="brin",
+        ),
+        Index(
+            "ix_serial_number_data_output_brin",
+            "data_output",
+            postgresql_using="brin",
+        ),
+    )
 
     warehouse_id: Mapped[int] = mapped_column(ForeignKey("warehouse.id"))
 
@@ -33,12 +72,39 @@ class SerialNumber(BaseClass, Base):
     employee_id: Mapped[int | None]
     buyer_id: Mapped[int | None]
     order_id: Mapped[int | None]
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', coalesce(name, ''))", persisted=True),
+        deferred=True,
+    )
 
     warehouse: Mapped["Warehouse"] = relationship(back_populates="serial_numbers")
 
 
 class Warehouse(BaseClass, Base):
     __tablename__ = "warehouse"
+    __table_args__ = (
+        Index(
+            "ux_warehouse_name_article",
+            "name",
+            "article",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_warehouse_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_warehouse_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index("ix_warehouse_supplier_id", "supplier_id"),
+        Index("ix_warehouse_manufacturer_id", "manufacturer_id"),
+    )
 
     manufacturer_id: Mapped[int] = mapped_column(ForeignKey("manufacturer.id"))
     supplier_id: Mapped[int] = mapped_column(ForeignKey("supplier.id"))
@@ -46,10 +112,21 @@ class Warehouse(BaseClass, Base):
     article: Mapped[str]
     name: Mapped[str]
     warranty: Mapped[int]
-    product_count_in_stock: Mapped[int | None]
-    product_count_out: Mapped[int | None]
+    if TYPE_CHECKING:
+        # read from stock_summary, mapped below it
+        product_count_in_stock: Mapped[int]
+        product_count_out: Mapped[int]
     position: Mapped[str | None]
     description: Mapped[str | None]
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_CONFIG}', "
+            "coalesce(article, '') || ' ' || coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     manufacturer: Mapped["Manufacturer"] = relationship(back_populates="warehouses")
     supplier: Mapped["Supplier"] = relationship(back_populates="warehouses")
@@ -58,20 +135,127 @@ class Warehouse(BaseClass, Base):
 
 class Supplier(BaseClass, Base):
     __tablename__ = "supplier"
+    __table_args__ = (
+        Index(
+            "ix_supplier_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_supplier_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_supplier_lookup",
+            "name",
+            "country",
+            "address",
+            "phone",
+            "email",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     name: Mapped[str]
     country: Mapped[str]
     address: Mapped[str]
     phone: Mapped[str]
     email: Mapped[str]
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_CONFIG}', coalesce(name, '') || ' ' || coalesce(country, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     warehouses: Mapped[list["Warehouse"]] = relationship(back_populates="supplier")
 
 
 class Manufacturer(BaseClass, Base):
     __tablename__ = "manufacturer"
+    __table_args__ = (
+        Index(
+            "ix_manufacturer_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_manufacturer_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_manufacturer_name_country",
+            "name",
+            "country",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     name: Mapped[str]
     country: Mapped[str]
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_CONFIG}', coalesce(name, '') || ' ' || coalesce(country, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     warehouses: Mapped[list["Warehouse"]] = relationship(back_populates="manufacturer")
+
+
+class ImportJob(BaseClass, Base):
+    __tablename__ = "import_job"
+
+    file_name: Mapped[str | None]
+    status: Mapped[ImportJobStatusEnum] = mapped_column(
+        default=ImportJobStatusEnum.PENDING,
+    )
+    rows_total: Mapped[int | None]
+    rows_processed: Mapped[int] = mapped_column(default=0)
+    started_at: Mapped[datetime.datetime | None]
+    finished_at: Mapped[datetime.datetime | None]
+    error: Mapped[str | None]
+
+
+class StockSummary(Base):
+    """Per warehouse and status totals of live serial numbers.
+
+    Kept up to date by statement-level triggers on serial_number (see the
+    stock_summary, stock_summary_versions and derived_stock_counters
+    migrations), so the application only reads it. Each connection writes to
+    its own `slot` row of a warehouse and status, readers sum over the slots.
+    """
+    __tablename__ = "stock_summary"
+
+    warehouse_id: Mapped[int] = mapped_column(ForeignKey("warehouse.id"), primary_key=True)
+    status: Mapped[SerialNumberStatusEnum] = mapped_column(primary_key=True)
+    slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=0)
+    serial_numbers: Mapped[int] = mapped_column(BigInteger, default=0)
+    price_input: Mapped[int] = mapped_column(BigInteger, default=0)
+    price_output: Mapped[int] = mapped_column(BigInteger, default=0)
+    margin: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime.datetime] = mapped_column(default=func.now())
+
+
+def _stock_count(*where) -> MappedSQLExpression[int]:
+    return column_property(
+        # sum() of bigint is numeric
+        select(func.coalesce(func.sum(StockSummary.serial_numbers), 0).cast(Integer))
+        .where(StockSummary.warehouse_id == Warehouse.id, *where)
+        .correlate_except(StockSummary)
+        .scalar_subquery(),
+    )
+
+
+# Derived instead of stored: a counter column on the warehouse row would make every
+# concurrent serial number write of the warehouse wait for the previous one to commit.
+Warehouse.product_count_in_stock = _stock_count(StockSummary.status == SerialNumberStatusEnum.WAREHOUSE)
+Warehouse.product_count_out = _stock_count(StockSummary.status != SerialNumberStatusEnum.WAREHOUSE)
@@ -6,3 +6,11 @@ class SerialNumberStatusEnum(StrEnum):
     SUPPLIER = "Заказчик"
     SOLD = "Продано"
     EXECUTOR = "Исполнитель"
+
+
+class ImportJobStatusEnum(StrEnum):
+    PENDING = "pending"
+    PARSING = "parsing"
+    IMPORTING = "importing"
+    DONE = "done"
+    FAILED = "failed"
@@ -1,14 +1,17 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.depends import get_db, get_current_username
+from app.depends import ConditionalGet, KeysetPagination, get_db, get_current_username
+from app.schemas.batch import BatchModel, BatchResultModel
 from app.schemas.manufacturer import (
-    ManufacturerFullModel, ManufacturerModel,
+    BatchPatchManufacturerModel, FilterManufacturerModel, ManufacturerFullModel, ManufacturerModel,
     PatchManufacturerModel,
 )
 from app.services.manufacturer import ManufacturerService
+from app.utils.export import EXPORT_FORMAT, EXPORT_MEDIA_TYPES
 
 router = APIRouter(
     prefix="/v1/manufacturer",
@@ -26,11 +29,46 @@ async def get_manufacturers(
     _: Annotated[str, Depends(get_current_username)],
     search: str | None = Query("", max_length=100),
     need_id: Annotated[list[int], Query()] = None,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    conditional: ConditionalGet = Depends(),
+    pagination: KeysetPagination = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
-    return await ManufacturerService(db=db).get_all_manufacturers(
-        search=search,
-        need_id=need_id,
+    not_modified = conditional.evaluate(
+        await ManufacturerService(db=db).get_validators(search=search, need_id=need_id),
+    )
+    if not_modified is not None:
+        return not_modified
+    return pagination.paginate(
+        await ManufacturerService(db=db).get_all_manufacturers(
+            search=search,
+            need_id=need_id,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=ManufacturerFullModel,
+    )
+
+
+@router.get("/export/", status_code=status.HTTP_200_OK)
+async def export_manufacturers(
+    _: Annotated[str, Depends(get_current_username)],
+    export_format: EXPORT_FORMAT = Query("ndjson", alias="format"),
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+):
+    return StreamingResponse(
+        ManufacturerService.export_manufacturers(
+            export_format=export_format,
+            search=search,
+            need_id=need_id,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=manufacturer.{export_format}"},
     )
 
 
@@ -42,11 +80,56 @@ async def get_manufacturers(
 async def get_one_manufacturer(
     _: Annotated[str, Depends(get_current_username)],
     item_id: int,
+    conditional: ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
+    not_modified = conditional.evaluate(
+        await ManufacturerService(db=db).get_validators(need_id=[item_id]),
+    )
+    if not_modified is not None:
+        return not_modified
     return await ManufacturerService(db=db).get_manufacturer(item_id=item_id)
 
 
+@router.post(
+    "/search/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[ManufacturerFullModel],
+)
+async def filter_manufacturers(
+    _: Annotated[str, Depends(get_current_username)],
+    filters: FilterManufacturerModel,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    pagination: KeysetPagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    return pagination.paginate(
+        await ManufacturerService(db=db).filter_manufacturers(
+            filters=filters,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=ManufacturerFullModel,
+    )
+
+
+@router.post(
+    "/batch/",
+    status_code=status.HTTP_200_OK,
+    response_model=BatchResultModel,
+)
+async def batch_manufacturers(
+    _: Annotated[str, Depends(get_current_username)],
+    request: BatchModel[ManufacturerModel, BatchPatchManufacturerModel],
+    db: AsyncSession = Depends(get_db),
+):
+    return await ManufacturerService(db=db).batch_manufacturers(request=request)
+
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
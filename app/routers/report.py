@@ -0,0 +1,126 @@
+import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.depends import get_db, get_current_username
+from app.models import SerialNumberStatusEnum
+from app.schemas.report import (
+    REPORT_GROUP, AgingBucketModel, SlowMoverModel, StockSummaryModel,
+    TurnoverMonthModel, WarehouseStockStateModel,
+)
+from app.services.report import ReportService
+
+router = APIRouter(
+    prefix="/v1/reports",
+    tags=["reports"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get(
+    "/stock_summary/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[StockSummaryModel],
+)
+async def get_stock_summary(
+    _: Annotated[str, Depends(get_current_username)],
+    group_by: REPORT_GROUP = "warehouse",
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query(description="Ids of the grouped entity")] = None,
+    serial_status: Annotated[list[SerialNumberStatusEnum], Query()] = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_stock_summary(
+        group_by=group_by,
+        search=search,
+        need_id=need_id,
+        serial_status=serial_status,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+@router.get(
+    "/aging/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[AgingBucketModel],
+)
+async def get_aging(
+    _: Annotated[str, Depends(get_current_username)],
+    bounds: Annotated[
+        list[int],
+        Query(description="Ascending bucket bounds in days in stock"),
+    ] = [30, 60, 90, 180, 365],
+    need_id: Annotated[list[int], Query(description="Warehouse ids")] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_aging(bounds=bounds, need_id=need_id)
+
+
+@router.get(
+    "/turnover/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[TurnoverMonthModel],
+)
+async def get_turnover(
+    _: Annotated[str, Depends(get_current_username)],
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    need_id: Annotated[list[int], Query(description="Warehouse ids")] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_turnover(
+        date_from=date_from,
+        date_to=date_to,
+        need_id=need_id,
+    )
+
+
+@router.get(
+    "/slow_movers/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[SlowMoverModel],
+)
+async def get_slow_movers(
+    _: Annotated[str, Depends(get_current_username)],
+    min_days: int = Query(90, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    need_id: Annotated[list[int], Query(description="Warehouse ids")] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_slow_movers(
+        min_days=min_days,
+        limit=limit,
+        need_id=need_id,
+    )
+
+
+@router.get(
+    "/warehouse_stock/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[StockSummaryModel],
+)
+async def get_warehouse_stock(
+    _: Annotated[str, Depends(get_current_username)],
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_warehouse_stock(search=search, need_id=need_id)
+
+
+@router.get(
+    "/warehouse_stock/state/",
+    status_code=status.HTTP_200_OK,
+    response_model=WarehouseStockStateModel,
+)
+async def get_warehouse_stock_state(
+    _: Annotated[str, Depends(get_current_username)],
+    db: AsyncSession = Depends(get_db),
+):
+    return await ReportService(db=db).get_warehouse_stock_state()
+
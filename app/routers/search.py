@@ -0,0 +1,31 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.depends import get_db, get_current_username
+from app.schemas.search import SEARCH_ENTITY, SearchHitModel
+from app.services.search import SearchService
+
+router = APIRouter(
+    prefix="/v1/search",
+    tags=["search"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=list[SearchHitModel])
+async def search_inventory(
+    _: Annotated[str, Depends(get_current_username)],
+    q: str = Query(..., min_length=1, max_length=100),
+    entity: Annotated[list[SEARCH_ENTITY], Query()] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_db),
+):
+    return await SearchService(db=db).search(
+        query=q,
+        entities=entity,
+        limit=limit,
+        offset=offset,
+    )
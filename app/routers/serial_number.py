@@ -1,14 +1,18 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.depends import get_db, get_current_username
+from app.depends import ConditionalGet, KeysetPagination, get_db, get_current_username
+from app.schemas.batch import BatchModel, BatchResultModel
 from app.schemas.serial_number import (
-    PatchSerialNumberModel, SerialNumberFullModel,
-    SerialNumberModel,
+    AllocateSerialNumbersModel, BatchPatchSerialNumberModel, FilterSerialNumberModel,
+    LookupSerialNumbersModel, PatchSerialNumberModel, SerialNumberFullModel,
+    SerialNumberLookupModel, SerialNumberModel,
 )
 from app.services.serial_number import SerialNumberService
+from app.utils.export import EXPORT_FORMAT, EXPORT_MEDIA_TYPES
 
 router = APIRouter(
     prefix="/v1/serial_number",
@@ -22,11 +26,46 @@ async def get_serial_numbers(
     _: Annotated[str, Depends(get_current_username)],
     search: str | None = Query("", max_length=100),
     need_id: Annotated[list[int], Query()] = None,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    conditional: ConditionalGet = Depends(),
+    pagination: KeysetPagination = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
-    return await SerialNumberService(db=db).get_all_serial_numbers(
-        search=search,
-        need_id=need_id,
+    not_modified = conditional.evaluate(
+        await SerialNumberService(db=db).get_validators(search=search, need_id=need_id),
+    )
+    if not_modified is not None:
+        return not_modified
+    return pagination.paginate(
+        await SerialNumberService(db=db).get_all_serial_numbers(
+            search=search,
+            need_id=need_id,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=SerialNumberFullModel,
+    )
+
+
+@router.get("/export/", status_code=status.HTTP_200_OK)
+async def export_serial_numbers(
+    _: Annotated[str, Depends(get_current_username)],
+    export_format: EXPORT_FORMAT = Query("ndjson", alias="format"),
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+):
+    return StreamingResponse(
+        SerialNumberService.export_serial_numbers(
+            export_format=export_format,
+            search=search,
+            need_id=need_id,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=serial_number.{export_format}"},
     )
 
 
@@ -38,11 +77,82 @@ async def get_serial_numbers(
 async def get_one_serial_number(
     _: Annotated[str, Depends(get_current_username)],
     item_id: int,
+    conditional: ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
+    not_modified = conditional.evaluate(
+        await SerialNumberService(db=db).get_validators(need_id=[item_id]),
+    )
+    if not_modified is not None:
+        return not_modified
     return await SerialNumberService(db=db).get_serial_number(item_id=item_id)
 
 
+@router.post(
+    "/search/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[SerialNumberFullModel],
+)
+async def filter_serial_numbers(
+    _: Annotated[str, Depends(get_current_username)],
+    filters: FilterSerialNumberModel,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    pagination: KeysetPagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    return pagination.paginate(
+        await SerialNumberService(db=db).filter_serial_numbers(
+            filters=filters,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=SerialNumberFullModel,
+    )
+
+
+@router.post(
+    "/allocate/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[SerialNumberFullModel],
+)
+async def allocate_serial_numbers(
+    _: Annotated[str, Depends(get_current_username)],
+    request: AllocateSerialNumbersModel,
+    db: AsyncSession = Depends(get_db),
+):
+    return await SerialNumberService(db=db).allocate_serial_numbers(request=request)
+
+
+@router.post(
+    "/lookup/",
+    status_code=status.HTTP_200_OK,
+    response_model=SerialNumberLookupModel,
+)
+async def lookup_serial_numbers(
+    _: Annotated[str, Depends(get_current_username)],
+    request: LookupSerialNumbersModel,
+    db: AsyncSession = Depends(get_db),
+):
+    return await SerialNumberService(db=db).lookup_serial_numbers(request=request)
+
+
+@router.post(
+    "/batch/",
+    status_code=status.HTTP_200_OK,
+    response_model=BatchResultModel,
+)
+async def batch_serial_numbers(
+    _: Annotated[str, Depends(get_current_username)],
+    request: BatchModel[SerialNumberModel, BatchPatchSerialNumberModel],
+    db: AsyncSession = Depends(get_db),
+):
+    return await SerialNumberService(db=db).batch_serial_numbers(request=request)
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=SerialNumberFullModel)
 async def create_new_serial_number(
     _: Annotated[str, Depends(get_current_username)],
@@ -1,14 +1,17 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.depends import get_db, get_current_username
+from app.depends import ConditionalGet, KeysetPagination, get_db, get_current_username
+from app.schemas.batch import BatchModel, BatchResultModel
 from app.schemas.supplier import (
-    PatchSupplierModel, SupplierFullModel,
+    BatchPatchSupplierModel, FilterSupplierModel, PatchSupplierModel, SupplierFullModel,
     SupplierModel,
 )
 from app.services.supplier import SupplierService
+from app.utils.export import EXPORT_FORMAT, EXPORT_MEDIA_TYPES
 
 router = APIRouter(
     prefix="/v1/supplier",
@@ -22,11 +25,46 @@ async def get_suppliers(
     _: Annotated[str, Depends(get_current_username)],
     search: str | None = Query("", max_length=100),
     need_id: Annotated[list[int], Query()] = None,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    conditional: ConditionalGet = Depends(),
+    pagination: KeysetPagination = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
-    return await SupplierService(db=db).get_all_suppliers(
-        search=search,
-        need_id=need_id,
+    not_modified = conditional.evaluate(
+        await SupplierService(db=db).get_validators(search=search, need_id=need_id),
+    )
+    if not_modified is not None:
+        return not_modified
+    return pagination.paginate(
+        await SupplierService(db=db).get_all_suppliers(
+            search=search,
+            need_id=need_id,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=SupplierFullModel,
+    )
+
+
+@router.get("/export/", status_code=status.HTTP_200_OK)
+async def export_suppliers(
+    _: Annotated[str, Depends(get_current_username)],
+    export_format: EXPORT_FORMAT = Query("ndjson", alias="format"),
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+):
+    return StreamingResponse(
+        SupplierService.export_suppliers(
+            export_format=export_format,
+            search=search,
+            need_id=need_id,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=supplier.{export_format}"},
     )
 
 
@@ -38,11 +76,56 @@ async def get_suppliers(
 async def get_one_supplier(
     _: Annotated[str, Depends(get_current_username)],
     item_id: int,
+    conditional: ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
+    not_modified = conditional.evaluate(
+        await SupplierService(db=db).get_validators(need_id=[item_id]),
+    )
+    if not_modified is not None:
+        return not_modified
     return await SupplierService(db=db).get_supplier(item_id=item_id)
 
 
+@router.post(
+    "/search/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[SupplierFullModel],
+)
+async def filter_suppliers(
+    _: Annotated[str, Depends(get_current_username)],
+    filters: FilterSupplierModel,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    pagination: KeysetPagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    return pagination.paginate(
+        await SupplierService(db=db).filter_suppliers(
+            filters=filters,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=SupplierFullModel,
+    )
+
+
+@router.post(
+    "/batch/",
+    status_code=status.HTTP_200_OK,
+    response_model=BatchResultModel,
+)
+async def batch_suppliers(
+    _: Annotated[str, Depends(get_current_username)],
+    request: BatchModel[SupplierModel, BatchPatchSupplierModel],
+    db: AsyncSession = Depends(get_db),
+):
+    return await SupplierService(db=db).batch_suppliers(request=request)
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=SupplierFullModel)
 async def create_new_supplier(
     _: Annotated[str, Depends(get_current_username)],
@@ -1,12 +1,20 @@
-from typing import Annotated
+import os
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status, UploadFile, File, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, status, UploadFile, File, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
-from app.depends import get_db, get_current_username
-from app.schemas.warehouse import WarehouseFullModel, WarehouseModel, PatchWarehouseModel, \
-    WarehouseWithSerialNumberModel
+from app.depends import ConditionalGet, KeysetPagination, get_db, get_current_username
+from app.models import SerialNumberStatusEnum
+from app.schemas.import_job import ImportJobFullModel
+from app.schemas.batch import BatchModel, BatchResultModel
+from app.schemas.warehouse import BatchPatchWarehouseModel, FilterWarehouseModel, WarehouseFullModel, \
+    WarehouseModel, PatchWarehouseModel, WarehouseWithSerialNumberModel
+from app.services.import_job import ImportJobService
 from app.services.warehouse import WarehouseService
+from app.utils.export import EXPORT_FORMAT, EXPORT_MEDIA_TYPES
 
 router = APIRouter(
     prefix="/v1/warehouse",
@@ -20,22 +28,117 @@ async def get_warehouses_with_serial_numbers(
     _: Annotated[str, Depends(get_current_username)],
     search: str | None = Query("", max_length=100),
     need_id: Annotated[list[int], Query()] = None,
+    include: Annotated[
+        list[str],
+        Query(description="Relations to load: serial_numbers, supplier, manufacturer"),
+    ] = None,
+    serial_status: Annotated[list[SerialNumberStatusEnum], Query()] = None,
+    serial_with_deleted: bool = False,
+    engine: Literal["orm", "db_json"] = "orm",
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    conditional: ConditionalGet = Depends(),
+    pagination: KeysetPagination = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
-    return await WarehouseService(db=db).get_warehouse_with_serial_numbers(
-        search=search,
-        need_id=need_id,
+    not_modified = conditional.evaluate(
+        await WarehouseService(db=db).get_validators(
+            search=search,
+            need_id=need_id,
+            include=include,
+        ),
+    )
+    if not_modified is not None:
+        return not_modified
+    return pagination.paginate(
+        await WarehouseService(db=db).get_warehouse_with_serial_numbers(
+            search=search,
+            need_id=need_id,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+            include=include,
+            serial_status=serial_status,
+            serial_with_deleted=serial_with_deleted,
+            engine=engine,
+        ),
+        model=WarehouseWithSerialNumberModel,
     )
 
 
-@router.post("/upload_excel_file/", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/upload_excel_file/",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ImportJobFullModel,
+)
 async def warehouse_upload_file(
     _: Annotated[str, Depends(get_current_username)],
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
 ):
-    await WarehouseService(db=db).parse_excel_file(file=file)
-    return {"status": 'File upload'}
+    job, path = await ImportJobService(db=db).create_import_job(file=file)
+    background_tasks.add_task(ImportJobService.run_import_job, job_id=job.id, path=path)
+    return job
+
+
+@router.post("/recount_stock/", status_code=status.HTTP_200_OK)
+async def recount_warehouse_stock(
+    _: Annotated[str, Depends(get_current_username)],
+    need_id: Annotated[list[int], Query()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    updated = await WarehouseService(db=db).recount_stock(need_id=need_id)
+    return {"updated": updated}
+
+
+@router.get("/export_excel/", status_code=status.HTTP_200_OK)
+async def export_warehouse_excel(
+    _: Annotated[str, Depends(get_current_username)],
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    path = await WarehouseService(db=db).export_excel(search=search, need_id=need_id)
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename="warehouse.xlsx",
+        background=BackgroundTask(os.remove, path),
+    )
+
+
+@router.get("/export/", status_code=status.HTTP_200_OK)
+async def export_warehouses(
+    _: Annotated[str, Depends(get_current_username)],
+    export_format: EXPORT_FORMAT = Query("ndjson", alias="format"),
+    search: str | None = Query("", max_length=100),
+    need_id: Annotated[list[int], Query()] = None,
+):
+    return StreamingResponse(
+        WarehouseService.export_warehouses(
+            export_format=export_format,
+            search=search,
+            need_id=need_id,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=warehouse.{export_format}"},
+    )
+
+
+@router.get(
+    "/import_jobs/{item_id}/",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportJobFullModel,
+)
+async def get_import_job(
+    _: Annotated[str, Depends(get_current_username)],
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    return await ImportJobService(db=db).get_import_job(item_id=item_id)
 
 
 @router.get(
@@ -46,11 +149,56 @@ async def warehouse_upload_file(
 async def get_one_warehouse(
     _: Annotated[str, Depends(get_current_username)],
     item_id: int,
+    conditional: ConditionalGet = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
+    not_modified = conditional.evaluate(
+        await WarehouseService(db=db).get_validators(need_id=[item_id]),
+    )
+    if not_modified is not None:
+        return not_modified
     return await WarehouseService(db=db).get_warehouse(item_id=item_id)
 
 
+@router.post(
+    "/search/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[WarehouseFullModel],
+)
+async def filter_warehouses(
+    _: Annotated[str, Depends(get_current_username)],
+    filters: FilterWarehouseModel,
+    fields: Annotated[
+        list[str],
+        Query(description="Return only these columns (id is always included)"),
+    ] = None,
+    pagination: KeysetPagination = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    return pagination.paginate(
+        await WarehouseService(db=db).filter_warehouses(
+            filters=filters,
+            limit=pagination.limit,
+            after=pagination.after,
+            fields=fields,
+        ),
+        model=WarehouseFullModel,
+    )
+
+
+@router.post(
+    "/batch/",
+    status_code=status.HTTP_200_OK,
+    response_model=BatchResultModel,
+)
+async def batch_warehouses(
+    _: Annotated[str, Depends(get_current_username)],
+    request: BatchModel[WarehouseModel, BatchPatchWarehouseModel],
+    db: AsyncSession = Depends(get_db),
+):
+    return await WarehouseService(db=db).batch_warehouses(request=request)
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=WarehouseFullModel)
 async def create_new_warehouse(
     _: Annotated[str, Depends(get_current_username)],
@@ -0,0 +1,28 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.schemas import ID_INT
+
+CreateModel = TypeVar("CreateModel", bound=BaseModel)
+PatchModel = TypeVar("PatchModel", bound=BaseModel)
+
+BATCH_MAX_ITEMS = 10000
+
+
+class BatchModel(BaseModel, Generic[CreateModel, PatchModel]):
+    create: list[CreateModel] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+    update: list[PatchModel] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+    delete: list[ID_INT] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+
+
+class BatchItemResultModel(BaseModel):
+    index: int
+    id: ID_INT | None = None
+    error: str | None = None
+
+
+class BatchResultModel(BaseModel):
+    create: list[BatchItemResultModel] = []
+    update: list[BatchItemResultModel] = []
+    delete: list[BatchItemResultModel] = []
@@ -0,0 +1,21 @@
+import datetime
+
+from pydantic import BaseModel
+
+from app.models import ImportJobStatusEnum
+from app.schemas import ID_INT
+
+
+class ImportJobModel(BaseModel):
+    file_name: str | None = None
+    status: ImportJobStatusEnum = ImportJobStatusEnum.PENDING
+
+
+class ImportJobFullModel(ImportJobModel):
+    id: ID_INT
+    rows_total: int | None = None
+    rows_processed: int
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    error: str | None = None
@@ -14,10 +14,22 @@ class ManufacturerFullModel(ManufacturerModel):
     id: ID_INT
 
 
+class FilterManufacturerModel(BaseModel):
+    id: list[ID_INT] | None = None
+    name: str | None = None
+    country: list[str] | None = None
+    created_from: datetime.datetime | None = None
+    created_to: datetime.datetime | None = None
+
+
 class PatchManufacturerModel(BaseModel):
     name: str | None = None
     country: str | None = None
 
 
+class BatchPatchManufacturerModel(PatchManufacturerModel):
+    id: ID_INT
+
+
 class DeleteManufacturer(BaseModel):
     deleted_at: datetime.datetime
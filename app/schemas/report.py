@@ -0,0 +1,54 @@
+import datetime
+from typing import Literal, TypeAlias
+
+from pydantic import BaseModel
+
+from app.models import SerialNumberStatusEnum
+from app.schemas import ID_INT
+
+REPORT_GROUP: TypeAlias = Literal["warehouse", "supplier", "manufacturer"]
+
+
+class StockSummaryModel(BaseModel):
+    id: ID_INT
+    name: str
+    serial_numbers: int
+    status_counts: dict[SerialNumberStatusEnum, int]
+    price_input: int
+    price_output: int
+    margin: int
+
+
+class WarehouseStockStateModel(BaseModel):
+    refreshed_at: datetime.datetime | None
+    source_version: int
+    applied_version: int
+    stale: bool
+
+
+class AgingBucketModel(BaseModel):
+    days_from: int
+    days_to: int | None
+    serial_numbers: int
+    price_input: int
+    share: float
+
+
+class TurnoverMonthModel(BaseModel):
+    month: datetime.date
+    received: int
+    shipped: int
+    sold: int
+    revenue: int
+    stock_end: int
+    sell_through: float | None
+
+
+class SlowMoverModel(BaseModel):
+    id: ID_INT
+    name: str
+    in_stock: int
+    oldest_days: int
+    average_days: float
+    last_output: datetime.date | None
+    rank: int
@@ -0,0 +1,14 @@
+from typing import Literal, TypeAlias
+
+from pydantic import BaseModel
+
+from app.schemas import ID_INT
+
+SEARCH_ENTITY: TypeAlias = Literal["warehouse", "serial_number", "supplier", "manufacturer"]
+
+
+class SearchHitModel(BaseModel):
+    entity: SEARCH_ENTITY
+    id: ID_INT
+    name: str
+    rank: float
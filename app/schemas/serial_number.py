@@ -1,6 +1,6 @@
 import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models import SerialNumberStatusEnum
 from app.schemas import ID_INT
@@ -23,6 +23,24 @@ class SerialNumberFullModel(SerialNumberModel):
     id: ID_INT
 
 
+class FilterSerialNumberModel(BaseModel):
+    id: list[ID_INT] | None = None
+    name: str | None = None
+    warehouse_id: list[ID_INT] | None = None
+    status: list[SerialNumberStatusEnum] | None = None
+    price_input_from: int | None = None
+    price_input_to: int | None = None
+    price_output_from: int | None = None
+    price_output_to: int | None = None
+    data_input_from: datetime.date | None = None
+    data_input_to: datetime.date | None = None
+    data_output_from: datetime.date | None = None
+    data_output_to: datetime.date | None = None
+    employee_id: list[int] | None = None
+    buyer_id: list[int] | None = None
+    order_id: list[int] | None = None
+
+
 class PatchSerialNumberModel(BaseModel):
     warehouse_id: ID_INT | None = None
     name: str | None = None
@@ -34,3 +52,38 @@ class PatchSerialNumberModel(BaseModel):
     employee_id: int | None = None
     buyer_id: int | None = None
     order_id: int | None = None
+
+
+class BatchPatchSerialNumberModel(PatchSerialNumberModel):
+    id: ID_INT
+
+
+class AllocateSerialNumbersModel(BaseModel):
+    warehouse_id: ID_INT
+    count: int = Field(ge=1, le=1000)
+    status: SerialNumberStatusEnum = SerialNumberStatusEnum.SOLD
+    order_id: int | None = None
+    buyer_id: int | None = None
+    employee_id: int | None = None
+    partial: bool = Field(
+        False,
+        description="Return fewer than count serial numbers instead of failing",
+    )
+
+
+class LookupSerialNumbersModel(BaseModel):
+    names: list[str] = Field(min_length=1, max_length=1000)
+
+
+class SerialNumberLookupItemModel(BaseModel):
+    id: ID_INT
+    name: str
+    warehouse_id: ID_INT
+    status: SerialNumberStatusEnum
+    price_input: int
+    price_output: int | None
+
+
+class SerialNumberLookupModel(BaseModel):
+    found: list[SerialNumberLookupItemModel]
+    unknown: list[str]
@@ -17,6 +17,15 @@ class SupplierFullModel(SupplierModel):
     id: ID_INT
 
 
+class FilterSupplierModel(BaseModel):
+    id: list[ID_INT] | None = None
+    name: str | None = None
+    country: list[str] | None = None
+    email: str | None = None
+    created_from: datetime.datetime | None = None
+    created_to: datetime.datetime | None = None
+
+
 class PatchSupplierModel(BaseModel):
     name: str | None = None
     country: str | None = None
@@ -25,5 +34,9 @@ class PatchSupplierModel(BaseModel):
     email: str | None = None
 
 
+class BatchPatchSupplierModel(PatchSupplierModel):
+    id: ID_INT
+
+
 class DeleteSupplier(BaseModel):
     deleted_at: datetime.datetime
@@ -1,7 +1,14 @@
-from pydantic import BaseModel
+import datetime
+from typing import Any
 
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+
+from app.databases.connect import Base
 from app.schemas import ID_INT
+from app.schemas.manufacturer import ManufacturerFullModel
 from app.schemas.serial_number import SerialNumberFullModel
+from app.schemas.supplier import SupplierFullModel
 
 
 class WarehouseModel(BaseModel):
@@ -10,14 +17,29 @@ class WarehouseModel(BaseModel):
     article: str
     name: str
     warranty: int
-    product_count_in_stock: int | None = None
-    product_count_out: int | None = None
     position: str | None = None
     description: str | None = None
 
 
 class WarehouseFullModel(WarehouseModel):
     id: ID_INT
+    # counted from the serial numbers, read only
+    product_count_in_stock: int | None = None
+    product_count_out: int | None = None
+
+
+class FilterWarehouseModel(BaseModel):
+    id: list[ID_INT] | None = None
+    name: str | None = None
+    article: list[str] | None = None
+    manufacturer_id: list[ID_INT] | None = None
+    supplier_id: list[ID_INT] | None = None
+    warranty_from: int | None = None
+    warranty_to: int | None = None
+    in_stock_from: int | None = None
+    in_stock_to: int | None = None
+    created_from: datetime.datetime | None = None
+    created_to: datetime.datetime | None = None
 
 
 class PatchWarehouseModel(BaseModel):
@@ -26,11 +48,29 @@ class PatchWarehouseModel(BaseModel):
     article: str | None = None
     name: str | None = None
     warranty: int | None = None
-    product_count_in_stock: int | None = None
-    product_count_out: int | None = None
     position: str | None = None
     description: str | None = None
 
 
+class BatchPatchWarehouseModel(PatchWarehouseModel):
+    id: ID_INT
+
+
 class WarehouseWithSerialNumberModel(WarehouseFullModel):
     serial_numbers: list[SerialNumberFullModel] | None = None
+    supplier: SupplierFullModel | None = None
+    manufacturer: ManufacturerFullModel | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relations(cls, data: Any) -> Any:
+        # relations that were not eager loaded are returned as null instead of
+        # triggering a lazy load, which is not possible on an async session
+        if isinstance(data, Base):
+            unloaded = inspect(data).unloaded
+            return {
+                field: getattr(data, field)
+                for field in cls.model_fields
+                if field not in unloaded
+            }
+        return data
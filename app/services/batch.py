@@ -0,0 +1,95 @@
+from logging import getLogger
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+
+from app.databases.dao.base_dao import BaseDAO
+from app.schemas.batch import BatchItemResultModel, BatchModel, BatchResultModel
+
+logger = getLogger(__name__)
+
+
+async def run_batch(
+    dao: BaseDAO,
+    batch: BatchModel,
+    unique_fields: Iterable[str],
+) -> BatchResultModel:
+    """Applies a create/update/delete batch with a handful of set-based statements.
+
+    Items that reference a missing row (e.g. a warehouse of an unknown supplier_id), that
+    duplicate a live row (or an earlier item) by `unique_fields`, and updates or deletes of
+    ids that are missing are reported per item and skipped. Any other database error (a
+    deadlock, a constraint the checks do not cover) rejects the whole batch with a 400 and
+    nothing is applied.
+    """
+    unique_fields = list(unique_fields)
+    result = BatchResultModel()
+    try:
+        create_items = [item.model_dump() for item in batch.create]
+        update_items = [item.model_dump(exclude_none=True) for item in batch.update]
+        references = await dao.get_live_references({
+            field: {item[field] for item in create_items + update_items if item.get(field) is not None}
+            for field in dao.reference_fields()
+        })
+
+        def missing_reference(item: dict) -> str | None:
+            for field, live_ids in references.items():
+                if item.get(field) is not None and item[field] not in live_ids:
+                    return f"{field} not found"
+            return None
+
+        keys = [tuple(item[field] for field in unique_fields) for item in create_items]
+        taken = await dao.get_live_keys(unique_fields, set(keys))
+        new_items = []
+        for index, (item, key) in enumerate(zip(create_items, keys)):
+            if error := missing_reference(item):
+                result.create.append(BatchItemResultModel(index=index, error=error))
+                continue
+            if key in taken:
+                result.create.append(BatchItemResultModel(index=index, error="already exists"))
+                continue
+            taken.add(key)
+            new_items.append((index, item))
+        rows = await dao.insert_bulk(
+            [item for _, item in new_items],
+            returning=[dao.model.id],
+        )
+        for (index, _), row in zip(new_items, rows if isinstance(rows, list) else []):
+            result.create.append(BatchItemResultModel(index=index, id=row.id))
+
+        live = {row.id for row in await dao.lock_live_rows([item["id"] for item in update_items])}
+        seen = set()
+        updates = []
+        for index, item in enumerate(update_items):
+            if item["id"] not in live:
+                error = "not found"
+            elif item["id"] in seen:
+                error = "duplicate id in batch"
+            else:
+                error = missing_reference(item)
+            if error:
+                result.update.append(BatchItemResultModel(index=index, id=item["id"], error=error))
+                continue
+            seen.add(item["id"])
+            result.update.append(BatchItemResultModel(index=index, id=item["id"]))
+            if len(item) > 1:
+                updates.append(item)
+        if updates:
+            await dao.update_bulk(updates)
+
+        deleted = {row.id for row in await dao.soft_delete_bulk(batch.delete)}
+        for index, item_id in enumerate(batch.delete):
+            if item_id not in deleted:
+                result.delete.append(BatchItemResultModel(index=index, id=item_id, error="not found"))
+                continue
+            deleted.remove(item_id)
+            result.delete.append(BatchItemResultModel(index=index, id=item_id))
+    except DBAPIError as exc:
+        logger.warning(f"Batch on {dao.model.__tablename__} rejected: {exc.orig or exc}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch rejected: {type(exc).__name__} {dao.model.__tablename__}",
+        )
+    result.create.sort(key=lambda item: item.index)
+    return result
@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import datetime
+import os
+import pickle
+import tempfile
+from logging import getLogger
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.databases.dao.import_job import ImportJobDAO
+from app.depends import async_context_get_db
+from app.models import ImportJobStatusEnum
+from app.schemas.import_job import ImportJobModel
+from app.services.warehouse import EXCEL_SHEET_NAME, WarehouseService
+from app.utils.process_pool import ProcessPool
+
+logger = getLogger(__name__)
+
+UPLOAD_READ_SIZE = 1024 * 1024
+STALE_ERROR = 'Import job stalled, the process running it has probably restarted'
+
+
+class ImportJobFinished(Exception):
+    """The job was finished elsewhere (e.g. failed by the stale sweep), its task must stop."""
+
+
+def dump_excel_file(path: str, chunks_path: str, sheet_name: str, chunk_size: int) -> int | None:
+    """Runs in the process pool: parses the sheet and pickles row chunks to `chunks_path`."""
+    rows_total = 0
+    with open(path, 'rb') as file:
+        chunks = WarehouseService._parse_file(file=file, sheet_name=sheet_name, chunk_size=chunk_size)
+        if chunks is None:
+            return None
+        with open(chunks_path, 'wb') as output:
+            for rows in chunks:
+                pickle.dump(rows, output, protocol=pickle.HIGHEST_PROTOCOL)
+                rows_total += len(rows)
+    return rows_total
+
+
+class ImportJobService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get_import_job(self, item_id: int):
+        async with ImportJobDAO(self.db) as dao:
+            result = await dao.get_one(
+                where=[
+                    dao.model.id == item_id,
+                    dao.model.deleted_at.is_(None),
+                ],
+            )
+            if not result:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f'ImportJob.id {item_id} not found'
+                )
+            return result
+
+    async def create_import_job(self, file: UploadFile) -> tuple[Any, str]:
+        path = await self._save_upload(file=file)
+        async with ImportJobDAO(self.db) as dao:
+            job = await dao.create_item(ImportJobModel(file_name=file.filename))
+        return job, path
+
+    @classmethod
+    async def run_import_job(cls, job_id: int, path: str) -> None:
+        chunks_path = f'{path}.chunks'
+        try:
+            await cls._update_job(
+                job_id,
+                status=ImportJobStatusEnum.PARSING,
+                started_at=datetime.datetime.now(),
+            )
+            rows_total = await cls._with_heartbeat(
+                job_id,
+                asyncio.get_running_loop().run_in_executor(
+                    ProcessPool().get_executor(),
+                    dump_excel_file,
+                    path,
+                    chunks_path,
+                    EXCEL_SHEET_NAME,
+                    settings.EXCEL_IMPORT_CHUNK_SIZE,
+                ),
+            )
+            if rows_total is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f'Sheet {EXCEL_SHEET_NAME} not found',
+                )
+            await cls._update_job(
+                job_id,
+                status=ImportJobStatusEnum.IMPORTING,
+                rows_total=rows_total,
+            )
+
+            async def on_chunk(rows_processed: int) -> None:
+                await cls._update_job(job_id, rows_processed=rows_processed)
+
+            async with async_context_get_db() as db:
+                await WarehouseService(db).import_excel_chunks(
+                    chunks=cls._load_chunks(chunks_path),
+                    on_chunk=on_chunk,
+                )
+            await cls._update_job(
+                job_id,
+                status=ImportJobStatusEnum.DONE,
+                finished_at=datetime.datetime.now(),
+            )
+        except ImportJobFinished:
+            logger.warning(f'Import job {job_id} was finished elsewhere, its import is rolled back')
+        except HTTPException as exc:
+            await cls._fail_job(job_id, str(exc.detail))
+        except Exception as exc:
+            logger.exception(f'Import job {job_id} failed')
+            await cls._fail_job(job_id, repr(exc))
+        finally:
+            for file_path in (path, chunks_path):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    @classmethod
+    async def sweep_stale_jobs(cls) -> None:
+        """Runs for the app's lifetime: fails the jobs whose process stopped reporting."""
+        while True:
+            try:
+                async with async_context_get_db() as db:
+                    async with ImportJobDAO(db) as dao:
+                        failed = await dao.fail_stale(
+                            stale_after=datetime.timedelta(seconds=settings.EXCEL_IMPORT_STALE_AFTER),
+                            error=STALE_ERROR,
+                        )
+                if failed:
+                    logger.warning(f'Failed {failed} stalled import jobs')
+            except Exception:
+                logger.exception('Stale import job sweep failed')
+            await asyncio.sleep(settings.EXCEL_IMPORT_HEARTBEAT)
+
+    @classmethod
+    async def _with_heartbeat(cls, job_id: int, future: asyncio.Future) -> Any:
+        """Awaits `future`, bumping the job's updated_at meanwhile so the sweep sees it alive."""
+        try:
+            while True:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), timeout=settings.EXCEL_IMPORT_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    await cls._update_job(job_id, updated_at=func.now())
+        finally:
+            # only drops a task still queued, a running parse ends on its own
+            future.cancel()
+
+    @classmethod
+    async def _fail_job(cls, job_id: int, error: str) -> None:
+        with contextlib.suppress(ImportJobFinished):
+            await cls._update_job(
+                job_id,
+                status=ImportJobStatusEnum.FAILED,
+                finished_at=datetime.datetime.now(),
+                error=error,
+            )
+
+    @staticmethod
+    async def _update_job(job_id: int, **values: Any) -> None:
+        """Raises ImportJobFinished when the job is no longer unfinished."""
+        async with async_context_get_db() as db:
+            async with ImportJobDAO(db) as dao:
+                if not await dao.update_unfinished(item_id=job_id, values=values):
+                    raise ImportJobFinished(job_id)
+
+    @staticmethod
+    async def _load_chunks(chunks_path: str) -> AsyncIterator[list[dict[str, Any]]]:
+        with open(chunks_path, 'rb') as file:
+            while True:
+                try:
+                    yield await asyncio.to_thread(pickle.load, file)
+                except EOFError:
+                    return
+
+    @staticmethod
+    async def _save_upload(file: UploadFile) -> str:
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as output:
+            while data := await file.read(UPLOAD_READ_SIZE):
+                await asyncio.to_thread(output.write, data)
+        return output.name
@@ -0,0 +1,139 @@
+import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.databases.dao.report import REPORT_GROUPS, ReportDAO
+from app.databases.dao.stock_summary import StockSummaryDAO
+from app.models import SerialNumber, SerialNumberStatusEnum, Warehouse
+from app.schemas.report import REPORT_GROUP
+
+
+class ReportService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get_stock_summary(
+        self,
+        group_by: REPORT_GROUP = "warehouse",
+        search: str | None = None,
+        need_id: list[int] | None = None,
+        serial_status: list[SerialNumberStatusEnum] | None = None,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+    ) -> list[dict]:
+        group_model = REPORT_GROUPS[group_by]
+        where: list[ColumnElement[bool]] = []
+        if need_id:
+            where.append(group_model.id.in_(need_id))
+        if search:
+            where.append(group_model.name.ilike(f"%{search}%"))
+        if serial_status:
+            where.append(SerialNumber.status.in_(serial_status))
+        if date_from:
+            where.append(SerialNumber.data_input >= date_from)
+        if date_to:
+            where.append(SerialNumber.data_input <= date_to)
+        async with ReportDAO(self.db) as dao:
+            rows = await dao.stock_summary(group_by=group_by, where=where)
+        return self._summary_rows(rows)
+
+    async def get_warehouse_stock(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> list[dict]:
+        where = []
+        if need_id:
+            where.append(Warehouse.id.in_(need_id))
+        if search:
+            where.append(Warehouse.name.ilike(f"%{search}%"))
+        async with StockSummaryDAO(self.db) as dao:
+            rows = await dao.get_warehouse_totals(where=where)
+        return self._summary_rows(rows)
+
+    async def get_warehouse_stock_state(self) -> dict:
+        async with StockSummaryDAO(self.db) as dao:
+            state = await dao.get_refresh_state()
+        return {
+            "refreshed_at": state.refreshed_at,
+            "source_version": state.source_version,
+            "applied_version": state.applied_version,
+            "stale": state.source_version != state.applied_version,
+        }
+
+    async def get_aging(
+        self,
+        bounds: list[int],
+        need_id: list[int] | None = None,
+    ) -> list[dict]:
+        if not bounds or bounds[0] <= 0 or bounds != sorted(set(bounds)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='bounds must be ascending positive numbers of days',
+            )
+        where = []
+        if need_id:
+            where.append(SerialNumber.warehouse_id.in_(need_id))
+        async with ReportDAO(self.db) as dao:
+            rows = await dao.aging(bounds=bounds, where=where)
+        edges = [0, *bounds, None]
+        return [
+            {
+                "days_from": edges[row.bucket],
+                "days_to": edges[row.bucket + 1],
+                "serial_numbers": row.serial_numbers,
+                "price_input": row.price_input,
+                "share": row.share,
+            }
+            for row in rows
+        ]
+
+    async def get_turnover(
+        self,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+        need_id: list[int] | None = None,
+    ):
+        date_to = date_to or datetime.date.today()
+        date_from = date_from or date_to.replace(year=date_to.year - 1, day=1)
+        if date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='date_from must not be after date_to',
+            )
+        where = []
+        if need_id:
+            where.append(SerialNumber.warehouse_id.in_(need_id))
+        async with ReportDAO(self.db) as dao:
+            return await dao.turnover(date_from=date_from, date_to=date_to, where=where)
+
+    async def get_slow_movers(
+        self,
+        min_days: int = 90,
+        limit: int = 50,
+        need_id: list[int] | None = None,
+    ):
+        where = []
+        if need_id:
+            where.append(SerialNumber.warehouse_id.in_(need_id))
+        async with ReportDAO(self.db) as dao:
+            return await dao.slow_movers(min_days=min_days, limit=limit, where=where)
+
+    @staticmethod
+    def _summary_rows(rows: list) -> list[dict]:
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "serial_numbers": row.serial_numbers,
+                "status_counts": {
+                    member: row._mapping[member.name] for member in SerialNumberStatusEnum
+                },
+                "price_input": row.price_input,
+                "price_output": row.price_output,
+                "margin": row.margin,
+            }
+            for row in rows
+        ]
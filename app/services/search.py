@@ -0,0 +1,25 @@
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.databases.dao.search import SearchDAO
+
+
+class SearchService:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def search(
+        self,
+        query: str,
+        entities: Iterable[str] | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ):
+        async with SearchDAO(self.db) as dao:
+            return await dao.search(
+                query=query,
+                entities=entities,
+                limit=limit,
+                offset=offset,
+            )
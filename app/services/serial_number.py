@@ -1,10 +1,23 @@
 import datetime
+from typing import AsyncIterator
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.databases.dao.base_dao import is_unique_violation
 from app.databases.dao.serial_number import SerialNumberDAO
-from app.schemas.serial_number import PatchSerialNumberModel, SerialNumberModel
+from app.depends import async_context_get_db
+from app.filters import SerialNumberFilterMapper
+from app.models import SerialNumberStatusEnum
+from app.schemas.batch import BatchModel, BatchResultModel
+from app.schemas.serial_number import (
+    AllocateSerialNumbersModel, BatchPatchSerialNumberModel, FilterSerialNumberModel,
+    LookupSerialNumbersModel, PatchSerialNumberModel, SerialNumberFullModel, SerialNumberModel,
+)
+from app.services.batch import run_batch
+from app.utils.export import EXPORT_FORMAT, encode_rows
+from app.utils.utils import split_query_list
 
 
 class SerialNumberService:
@@ -15,19 +28,80 @@ class SerialNumberService:
         self,
         search: str | None = None,
         need_id: list[int] | None = None,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
     ):
         async with SerialNumberDAO(self.db) as dao:
-            serial_numbers_ids = []
-            if need_id:
-                serial_numbers_ids = [dao.model.id.in_(need_id)]
-            return await dao.get_list(
-                where=[
-                    dao.model.name.ilike(f"%{search}%"),
-                    dao.model.deleted_at.is_(None),
-                    *serial_numbers_ids,
-                ],
+            try:
+                return await dao.get_page(
+                    where=dao.search_where(search=search, need_id=need_id),
+                    limit=limit,
+                    after=after,
+                    fields=split_query_list(fields),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def filter_serial_numbers(
+        self,
+        filters: FilterSerialNumberModel,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
+    ):
+        async with SerialNumberDAO(self.db) as dao:
+            try:
+                return await dao.get_page(
+                    where=[
+                        dao.model.deleted_at.is_(None),
+                        *SerialNumberFilterMapper(filters).filter_params(),
+                    ],
+                    limit=limit,
+                    after=after,
+                    fields=split_query_list(fields),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def get_validators(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ):
+        async with SerialNumberDAO(self.db) as dao:
+            return await dao.get_validators(
+                where=dao.search_where(search=search, need_id=need_id),
             )
 
+    @staticmethod
+    async def export_serial_numbers(
+        export_format: EXPORT_FORMAT,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> AsyncIterator[bytes]:
+        # the request session is closed before a streaming body is sent, so use an own one
+        async with async_context_get_db() as db:
+            async with SerialNumberDAO(db) as dao:
+                columns = dao.get_columns(SerialNumberFullModel.model_fields)
+                partitions = dao.stream_rows(
+                    columns,
+                    where=dao.search_where(search=search, need_id=need_id),
+                    order_by=[dao.model.id],
+                )
+                async for chunk in encode_rows(
+                    partitions,
+                    columns=[column.key for column in columns],
+                    export_format=export_format,
+                ):
+                    yield chunk
+
     async def get_serial_number(self, item_id: int):
         async with SerialNumberDAO(self.db) as dao:
             result = await dao.get_one(
@@ -45,45 +119,88 @@ class SerialNumberService:
 
     async def create_serial_number(self, request: SerialNumberModel):
         async with SerialNumberDAO(self.db) as dao:
-            if await dao.get_one(
-                where=[
+            result = await dao.insert_returning(
+                request,
+                unless_exists=[
                     dao.model.name == request.name,
                     dao.model.deleted_at.is_(None),
                 ],
-            ):
+            )
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Серийный номер с такими параметрами уже существует. Создание нового не возможно.",
                 )
-            return await dao.create_item(request)
+            return result
 
     async def update_serial_number(self, item_id: int, request: PatchSerialNumberModel):
         async with SerialNumberDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
-            ):
+            try:
+                result = await dao.update_returning(
+                    item_id=item_id,
+                    item=request,
+                )
+            except IntegrityError as exc:
+                if not is_unique_violation(exc):
+                    raise
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Серийный номер с такими параметрами уже существует. Обновление не возможно.",
+                )
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Серийный номер с таким id {item_id} не существует. Обновление не возможно.",
                 )
-            return await dao.update_item(item_id=item_id, item=request)
+            return result
 
     async def delete_serial_number(self, item_id: int):
         async with SerialNumberDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
-            ):
+            serial_number = await dao.update_returning(
+                item_id=item_id,
+                item={"deleted_at": datetime.datetime.now()},
+            )
+            if not serial_number:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Серийный номер с таким id {item_id} не существует. Удаление не возможно.",
                 )
-            await dao.update_item(
-                item_id=item_id,
-                item={"deleted_at": datetime.datetime.now()},
-            )
\ No newline at end of file
+
+    async def allocate_serial_numbers(self, request: AllocateSerialNumbersModel):
+        if request.status == SerialNumberStatusEnum.WAREHOUSE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Статус {request.status} не выводит серийный номер со склада.",
+            )
+        async with SerialNumberDAO(self.db) as dao:
+            result = await dao.allocate(
+                warehouse_id=request.warehouse_id,
+                count=request.count,
+                values=request.model_dump(
+                    include={"status", "order_id", "buyer_id", "employee_id"},
+                    exclude_none=True,
+                ),
+            )
+            if len(result) < request.count and not (result and request.partial):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"На складе {request.warehouse_id} доступно {len(result)} из {request.count} серийных номеров.",
+                )
+            return result
+
+    async def lookup_serial_numbers(self, request: LookupSerialNumbersModel) -> dict[str, list]:
+        names = list(dict.fromkeys(request.names))
+        async with SerialNumberDAO(self.db) as dao:
+            found = await dao.lookup(names=names)
+        known = {row.name for row in found}
+        return {
+            "found": found,
+            "unknown": [name for name in names if name not in known],
+        }
+
+    async def batch_serial_numbers(
+        self,
+        request: BatchModel[SerialNumberModel, BatchPatchSerialNumberModel],
+    ) -> BatchResultModel:
+        async with SerialNumberDAO(self.db) as dao:
+            return await run_batch(dao, request, unique_fields=("name",))
@@ -1,10 +1,20 @@
 import datetime
+from typing import AsyncIterator
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.databases.dao.supplier import SupplierDAO
-from app.schemas.supplier import PatchSupplierModel, SupplierModel
+from app.depends import async_context_get_db
+from app.filters import SupplierFilterMapper
+from app.schemas.batch import BatchModel, BatchResultModel
+from app.schemas.supplier import (
+    BatchPatchSupplierModel, FilterSupplierModel, PatchSupplierModel, SupplierFullModel,
+    SupplierModel,
+)
+from app.services.batch import run_batch
+from app.utils.export import EXPORT_FORMAT, encode_rows
+from app.utils.utils import split_query_list
 
 
 class SupplierService:
@@ -15,19 +25,80 @@ class SupplierService:
         self,
         search: str | None = None,
         need_id: list[int] | None = None,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
     ):
         async with SupplierDAO(self.db) as dao:
-            supplier_ids = []
-            if need_id:
-                supplier_ids = [dao.model.id.in_(need_id)]
-            return await dao.get_list(
-                where=[
-                    dao.model.name.ilike(f"%{search}%"),
-                    dao.model.deleted_at.is_(None),
-                    *supplier_ids,
-                ],
+            try:
+                return await dao.get_page(
+                    where=dao.search_where(search=search, need_id=need_id),
+                    limit=limit,
+                    after=after,
+                    fields=split_query_list(fields),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def filter_suppliers(
+        self,
+        filters: FilterSupplierModel,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
+    ):
+        async with SupplierDAO(self.db) as dao:
+            try:
+                return await dao.get_page(
+                    where=[
+                        dao.model.deleted_at.is_(None),
+                        *SupplierFilterMapper(filters).filter_params(),
+                    ],
+                    limit=limit,
+                    after=after,
+                    fields=split_query_list(fields),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def get_validators(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ):
+        async with SupplierDAO(self.db) as dao:
+            return await dao.get_validators(
+                where=dao.search_where(search=search, need_id=need_id),
             )
 
+    @staticmethod
+    async def export_suppliers(
+        export_format: EXPORT_FORMAT,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> AsyncIterator[bytes]:
+        # the request session is closed before a streaming body is sent, so use an own one
+        async with async_context_get_db() as db:
+            async with SupplierDAO(db) as dao:
+                columns = dao.get_columns(SupplierFullModel.model_fields)
+                partitions = dao.stream_rows(
+                    columns,
+                    where=dao.search_where(search=search, need_id=need_id),
+                    order_by=[dao.model.id],
+                )
+                async for chunk in encode_rows(
+                    partitions,
+                    columns=[column.key for column in columns],
+                    export_format=export_format,
+                ):
+                    yield chunk
+
     async def get_supplier(self, item_id: int):
         async with SupplierDAO(self.db) as dao:
             result = await dao.get_one(
@@ -45,8 +116,9 @@ class SupplierService:
 
     async def create_supplier(self, request: SupplierModel):
         async with SupplierDAO(self.db) as dao:
-            if await dao.get_one(
-                where=[
+            result = await dao.insert_returning(
+                request,
+                unless_exists=[
                     dao.model.name == request.name,
                     dao.model.country == request.country,
                     dao.model.address == request.address,
@@ -54,40 +126,42 @@ class SupplierService:
                     dao.model.email == request.email,
                     dao.model.deleted_at.is_(None),
                 ],
-            ):
+            )
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Поставщик с такими параметрами уже существует. Создание нового не возможно.",
                 )
-            return await dao.create_item(request)
+            return result
 
     async def update_supplier(self, item_id: int, request: PatchSupplierModel):
         async with SupplierDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
-            ):
+            result = await dao.update_returning(item_id=item_id, item=request)
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Поставщик с таким id {item_id} не существует. Обновление не возможно.",
                 )
-            return await dao.update_item(item_id=item_id, item=request)
+            return result
 
     async def delete_supplier(self, item_id: int):
         async with SupplierDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
+            if not await dao.update_returning(
+                item_id=item_id,
+                item={"deleted_at": datetime.datetime.now()},
             ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Поставщик с таким id {item_id} не существует. Удаление не возможно.",
                 )
-            await dao.update_item(
-                item_id=item_id,
-                item={"deleted_at": datetime.datetime.now()},
+
+    async def batch_suppliers(
+        self,
+        request: BatchModel[SupplierModel, BatchPatchSupplierModel],
+    ) -> BatchResultModel:
+        async with SupplierDAO(self.db) as dao:
+            return await run_batch(
+                dao,
+                request,
+                unique_fields=("name", "country", "address", "phone", "email"),
             )
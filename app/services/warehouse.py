@@ -1,20 +1,46 @@
+import asyncio
 import datetime
-from io import BytesIO
-from typing import Any
+import os
+import tempfile
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, BinaryIO, Callable, Iterator, Literal
 
 import openpyxl
-from fastapi import UploadFile, File, HTTPException, status
-from sqlalchemy.exc import DBAPIError
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_
 
+from app.config import settings
+from app.databases.dao.base_dao import is_unique_violation
 from app.databases.dao.manufacturer import ManufacturerDAO
 from app.databases.dao.serial_number import SerialNumberDAO
+from app.databases.dao.stock_summary import StockSummaryDAO
 from app.databases.dao.supplier import SupplierDAO
 from app.databases.dao.transaction_layer import TransactionLayer
 from app.databases.dao.warehouse import WarehouseDAO
-from app.models import SerialNumberStatusEnum, Warehouse
-from app.schemas.warehouse import WarehouseModel, PatchWarehouseModel
+from app.depends import async_context_get_db
+from app.filters import WarehouseFilterMapper
+from app.models import Manufacturer, SerialNumber, SerialNumberStatusEnum, Supplier, Warehouse
+from app.schemas.batch import BatchModel, BatchResultModel
+from app.schemas.warehouse import (
+    BatchPatchWarehouseModel, FilterWarehouseModel, PatchWarehouseModel, WarehouseFullModel,
+    WarehouseModel, WarehouseWithSerialNumberModel,
+)
+from app.services.batch import run_batch
+from app.utils.export import EXPORT_FORMAT, encode_rows
+from app.utils.utils import split_query_list
+
+EXCEL_SHEET_NAME = 'ЗАКАЗ'
+# Header order of the import sheet; `_import_rows` reads rows by these names.
+EXCEL_HEADERS = (
+    'Артикул',
+    'Наименование ',
+    'Поставщик',
+    'Производитель',
+    'Гарантия, мес.',
+    'кол-во по позиции',
+    'Серийный номер\nS/N',
+    'Цена входа',
+)
 
 
 class WarehouseService:
@@ -25,19 +51,170 @@ class WarehouseService:
         self,
         search: str | None = None,
         need_id: list[int] | None = None,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
+        include: list[str] | None = None,
+        serial_status: list[SerialNumberStatusEnum] | None = None,
+        serial_with_deleted: bool = False,
+        engine: Literal['orm', 'db_json'] = 'orm',
+    ):
+        include, fields = split_query_list(include), split_query_list(fields)
+        if include and fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='include and fields can not be combined',
+            )
+        if fields and engine == 'db_json':
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='fields is not supported by the db_json engine',
+            )
+        serial_criteria = []
+        if not serial_with_deleted:
+            serial_criteria.append(SerialNumber.deleted_at.is_(None))
+        if serial_status:
+            serial_criteria.append(SerialNumber.status.in_(serial_status))
+        try:
+            select_in_load = WarehouseDAO.relation_loaders(
+                include=include,
+                criteria={'serial_numbers': serial_criteria},
+            )
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc),
+            )
+        async with WarehouseDAO(self.db) as dao:
+            where = dao.search_where(search=search, need_id=need_id)
+            if engine == 'db_json':
+                return await dao.get_json_page(
+                    schema=WarehouseWithSerialNumberModel,
+                    include=include,
+                    criteria={'serial_numbers': serial_criteria},
+                    limit=limit,
+                    after=after,
+                    where=where,
+                )
+            try:
+                return await dao.get_page(
+                    where=where,
+                    limit=limit,
+                    after=after,
+                    fields=fields,
+                    select_in_load=select_in_load,
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def filter_warehouses(
+        self,
+        filters: FilterWarehouseModel,
+        limit: int | None = None,
+        after: int | None = None,
+        fields: list[str] | None = None,
     ):
         async with WarehouseDAO(self.db) as dao:
-            warehouse_ids = []
-            if need_id:
-                warehouse_ids = [dao.model.id.in_(need_id)]
-            return await dao.get_list(
+            try:
+                return await dao.get_page(
+                    where=[
+                        dao.model.deleted_at.is_(None),
+                        *WarehouseFilterMapper(filters).filter_params(),
+                    ],
+                    limit=limit,
+                    after=after,
+                    fields=split_query_list(fields),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    async def get_validators(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+        include: list[str] | None = None,
+    ):
+        async with WarehouseDAO(self.db) as dao:
+            try:
+                return await dao.get_validators(
+                    where=dao.search_where(search=search, need_id=need_id),
+                    include=split_query_list(include),
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(exc),
+                )
+
+    @staticmethod
+    async def export_warehouses(
+        export_format: EXPORT_FORMAT,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> AsyncIterator[bytes]:
+        # the request session is closed before a streaming body is sent, so use an own one
+        async with async_context_get_db() as db:
+            async with WarehouseDAO(db) as dao:
+                columns = dao.get_columns(WarehouseFullModel.model_fields)
+                partitions = dao.stream_rows(
+                    columns,
+                    where=dao.search_where(search=search, need_id=need_id),
+                    order_by=[dao.model.id],
+                )
+                async for chunk in encode_rows(
+                    partitions,
+                    columns=[column.key for column in columns],
+                    export_format=export_format,
+                ):
+                    yield chunk
+
+    async def export_excel(
+        self,
+        search: str | None = None,
+        need_id: list[int] | None = None,
+    ) -> str:
+        """Writes in-stock serial numbers to a temp xlsx in the import layout, returns its path."""
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet(EXCEL_SHEET_NAME)
+        worksheet.append(EXCEL_HEADERS)
+        async with WarehouseDAO(self.db) as dao:
+            partitions = dao.stream_rows(
+                [
+                    Warehouse.article,
+                    Warehouse.name,
+                    Supplier.name,
+                    Manufacturer.name,
+                    Warehouse.warranty,
+                    Warehouse.product_count_in_stock,
+                    SerialNumber.name,
+                    SerialNumber.price_input,
+                ],
+                join=[SerialNumber, Supplier, Manufacturer],
                 where=[
-                    dao.model.name.ilike(f"%{search}%"),
-                    dao.model.deleted_at.is_(None),
-                    *warehouse_ids,
+                    *dao.search_where(search=search, need_id=need_id),
+                    SerialNumber.deleted_at.is_(None),
+                    SerialNumber.status == SerialNumberStatusEnum.WAREHOUSE,
                 ],
-                select_in_load=[dao.model.serial_numbers]
+                order_by=[Warehouse.id, SerialNumber.id],
             )
+            async for partition in partitions:
+                for row in partition:
+                    worksheet.append(tuple(row))
+        output = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False)
+        try:
+            with output:
+                await asyncio.to_thread(workbook.save, output)
+        except BaseException:
+            # the router only attaches the cleanup task to a file that was saved
+            os.remove(output.name)
+            raise
+        return output.name
 
     async def get_warehouse(self, item_id: int):
         async with WarehouseDAO(self.db) as dao:
@@ -56,191 +233,199 @@ class WarehouseService:
 
     async def create_warehouse(self, request: WarehouseModel):
         async with WarehouseDAO(self.db) as dao:
-            if await dao.get_one(
-                where=[
+            result = await dao.insert_returning(
+                request,
+                unless_exists=[
                     dao.model.name == request.name,
                     dao.model.article == request.article,
                     dao.model.deleted_at.is_(None),
                 ],
-            ):
+            )
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Товар с такими параметрами уже существует. Создание нового не возможно.",
                 )
-            return await dao.create_item(request)
+            return result
 
     async def update_warehouse(self, item_id: int, request: PatchWarehouseModel):
         async with WarehouseDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
-            ):
+            try:
+                result = await dao.update_returning(item_id=item_id, item=request)
+            except IntegrityError as exc:
+                if not is_unique_violation(exc):
+                    raise
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Товар с такими параметрами уже существует. Обновление не возможно.",
+                )
+            if not result:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Товар с таким id {item_id} не существует. Обновление не возможно.",
                 )
-            return await dao.update_item(item_id=item_id, item=request)
+            return result
 
     async def delete_warehouse(self, item_id: int):
         async with WarehouseDAO(self.db) as dao:
-            if not await dao.get_one(
-                where=[
-                    dao.model.id == item_id,
-                    dao.model.deleted_at.is_(None),
-                ],
+            if not await dao.update_returning(
+                item_id=item_id,
+                item={"deleted_at": datetime.datetime.now()},
             ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Товар с таким id {item_id} не существует. Удаление не возможно.",
                 )
-            await dao.update_item(
-                item_id=item_id,
-                item={"deleted_at": datetime.datetime.now()},
-            )
 
-    async def parse_excel_file(
+    async def batch_warehouses(
         self,
-        file: UploadFile = File(...),
-    ) -> None:
-        tables: dict[str, list[dict[str, Any]]] = self._parse_file(file=file)
-
-        if not tables.get('ЗАКАЗ'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Sheet ЗАКАЗ not found',
-            )
+        request: BatchModel[WarehouseModel, BatchPatchWarehouseModel],
+    ) -> BatchResultModel:
+        async with WarehouseDAO(self.db) as dao:
+            return await run_batch(dao, request, unique_fields=("name", "article"))
 
-        new_warehouses: list[dict[str, Any]] = []
-        new_serial_numbers = {}
-        check_product_warehouse: set = set()
-        check_product_serial_number: set = set()
+    async def recount_stock(self, need_id: list[int] | None = None) -> int:
+        async with StockSummaryDAO(self.db) as dao:
+            return await dao.rebuild(warehouse_ids=need_id or None)
 
+    async def import_excel_chunks(
+        self,
+        chunks: AsyncIterable[list[dict[str, Any]]],
+        on_chunk: Callable[[int], Awaitable[None]] | None = None,
+    ) -> None:
         async with TransactionLayer(self.db):
-            warehouse_names = {str(row['Наименование ']) for row in tables.get('ЗАКАЗ') if row['Наименование ']}
-            warehouse_articles = {str(row['Артикул']) for row in tables.get('ЗАКАЗ') if row['Артикул']}
-            warehouse_records = await WarehouseDAO(self.db).get_warehouse_by_name_and_article_with_serial_number(
-                names=list(warehouse_names),
-                articles=list(warehouse_articles),
-            )
             suppliers = await SupplierDAO(self.db).get_list()
             suppliers = {supplier.name: supplier.id for supplier in suppliers}
             manufacturers = await ManufacturerDAO(self.db).get_list()
             manufacturers = {manufacturer.name: manufacturer.id for manufacturer in manufacturers}
-            if warehouse_records:
-                check_product_warehouse = {
-                    warehouse.name for warehouse in warehouse_records
-                }
-                check_product_serial_number = {
-                    serial_number.name for warehouse in warehouse_records
-                    for serial_number in warehouse.serial_numbers
-                }
 
-            for row in tables.get('ЗАКАЗ'):
-                if not row.get('Артикул'):
-                    continue
-                if not row.get('Поставщик'):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f'Не указан поставщик в строке {row}',
-                    )
-                if not row.get('Производитель'):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f'Не указан производитель в строке {row}',
-                    )
-                if row.get('Наименование ') not in check_product_warehouse:
-                    warehouse = {
-                        'manufacturer_id': manufacturers.get(row.get('Производитель')),
-                        'supplier_id': suppliers.get(row.get('Поставщик')),
-                        'article': str(row.get('Артикул')),
-                        'name': str(row.get('Наименование ')),
-                        'warranty': row.get('Гарантия, мес.'),
-                        'product_count_in_stock': row.get('кол-во по позиции'),
-                    }
-                    check_product_warehouse.add(row.get('Наименование '))
-                    new_warehouses.append(warehouse)
-                if row.get('Серийный номер\nS/N') in check_product_serial_number:
-                    continue
-                serial_number = {
-                        'name': row.get('Серийный номер\nS/N'),
-                        'status': SerialNumberStatusEnum.WAREHOUSE,
-                        'price_input': row.get('Цена входа'),
+            rows_processed = 0
+            async for rows in chunks:
+                await self._import_rows(
+                    rows=rows,
+                    suppliers=suppliers,
+                    manufacturers=manufacturers,
+                )
+                rows_processed += len(rows)
+                if on_chunk:
+                    await on_chunk(rows_processed)
+            if not rows_processed:
+                # a missing sheet is reported by `_parse_file`, here it exists but is empty
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f'Sheet {EXCEL_SHEET_NAME} has no data rows',
+                )
+
+    async def _import_rows(
+        self,
+        rows: list[dict[str, Any]],
+        suppliers: dict[str, int],
+        manufacturers: dict[str, int],
+    ) -> None:
+        new_warehouses: dict[tuple[str, str], dict[str, Any]] = {}
+        new_serial_numbers: list[tuple[tuple[str, str], dict[str, Any]]] = []
+
+        for row in rows:
+            if not row.get('Артикул'):
+                continue
+            if not row.get('Поставщик'):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f'Не указан поставщик в строке {row}',
+                )
+            if not row.get('Производитель'):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f'Не указан производитель в строке {row}',
+                )
+            warehouse_key = (str(row.get('Наименование ')), str(row.get('Артикул')))
+            if warehouse_key not in new_warehouses:
+                new_warehouses[warehouse_key] = {
+                    'manufacturer_id': manufacturers.get(row['Производитель']),
+                    'supplier_id': suppliers.get(row['Поставщик']),
+                    'article': warehouse_key[1],
+                    'name': warehouse_key[0],
+                    'warranty': row.get('Гарантия, мес.'),
                 }
-                check_product_serial_number.add(row.get('Серийный номер\nS/N'))
-                if new_serial_numbers.get(row.get('Наименование ')):
-                    new_serial_numbers.get(row.get('Наименование ')).append(serial_number)
-                    continue
+            serial_number = {
+                'name': row.get('Серийный номер\nS/N'),
+                'status': SerialNumberStatusEnum.WAREHOUSE,
+                'price_input': row.get('Цена входа'),
+            }
+            new_serial_numbers.append((warehouse_key, serial_number))
 
-                new_serial_numbers[row.get('Наименование ')] = [serial_number]
-
-            if new_warehouses:
-                try:
-                    await WarehouseDAO(self.db).insert_bulk(items=new_warehouses)
-                except DBAPIError:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail='DBAPIError warehouse',
-                    )
-            warehouse_records = await WarehouseDAO(self.db).get_list(
-                where=[
-                    and_(
-                        Warehouse.name.in_(warehouse_names),
-                        Warehouse.article.in_(warehouse_articles)
-                    )
-                ]
+        if not new_warehouses:
+            return
 
+        try:
+            # `name` is rewritten with itself so that already existing products
+            # are returned by RETURNING as well.
+            warehouse_records = await WarehouseDAO(self.db).upsert_bulk(
+                items=list(new_warehouses.values()),
+                index_elements=['name', 'article'],
+                index_where=Warehouse.deleted_at.is_(None),
+                update_columns=['name'],
+                returning=[Warehouse.id, Warehouse.name, Warehouse.article],
             )
-            warehouse_records = {
-                warehouse.name: warehouse.id for warehouse in warehouse_records
-            }
-            new_serial_numbers = [
-                {'warehouse_id': warehouse_records.get(warehouse_name), **serial}
-                for warehouse_name, serials in new_serial_numbers.items()
-                for serial in serials
-            ]
-            if new_serial_numbers:
-                try:
-                    await SerialNumberDAO(self.db).insert_bulk(items=new_serial_numbers)
-                except DBAPIError:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail='DBAPIError serial_numbers',
-                    )
-            warehouse_records = await WarehouseDAO(self.db).get_warehouse_by_name_with_serial_number_to_stock(
-                names=list(check_product_warehouse),
+        except DBAPIError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='DBAPIError warehouse',
+            )
+        warehouse_ids = {
+            (warehouse.name, warehouse.article): warehouse.id for warehouse in warehouse_records
+        }
+        try:
+            await SerialNumberDAO(self.db).copy_insert_bulk(
+                items=[
+                    {'warehouse_id': warehouse_ids[warehouse_key], **serial}
+                    for warehouse_key, serial in new_serial_numbers
+                ],
+                index_elements=['name'],
+                index_where=SerialNumber.deleted_at.is_(None),
+            )
+        except DBAPIError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='DBAPIError serial_numbers',
             )
-            update_warehouse = [
-                {'id': warehouse.id, 'product_count_in_stock': len(warehouse.serial_numbers)}
-                for warehouse in warehouse_records
-            ]
-            if update_warehouse:
-                try:
-                    await WarehouseDAO(self.db).update_bulk(items=update_warehouse)
-                except DBAPIError:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail='DBAPIError warehouse',
-                    )
 
     @staticmethod
-    def _parse_file(file: UploadFile = File(...)) -> dict[str, list[dict[str, Any]]]:
-        tables: dict[str, list[dict[str, Any]]] = {}
-        with BytesIO(file.file.read()) as buffer:
-            dataframe = openpyxl.load_workbook(buffer)
+    def _parse_file(
+        file: BinaryIO,
+        sheet_name: str = EXCEL_SHEET_NAME,
+        chunk_size: int = settings.EXCEL_IMPORT_CHUNK_SIZE,
+    ) -> Iterator[list[dict[str, Any]]] | None:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        if sheet_name not in workbook.sheetnames:
+            workbook.close()
+            return None
+        return WarehouseService._iter_sheet_rows(
+            workbook=workbook,
+            sheet_name=sheet_name,
+            chunk_size=chunk_size,
+        )
 
-        for sheet_name in dataframe.sheetnames:
+    @staticmethod
+    def _iter_sheet_rows(
+        workbook: openpyxl.Workbook,
+        sheet_name: str,
+        chunk_size: int,
+    ) -> Iterator[list[dict[str, Any]]]:
+        try:
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            headers_row = next(rows, None)
+            if not headers_row:
+                return
             table = []
-            sheet = dataframe[sheet_name]
-            headers_row = [value.value for value in sheet[1]]
-            for row in sheet.iter_rows(values_only=True):
-                element = {}
+            for row in rows:
                 if headers_row[0] == row[0]:
                     continue
-                for key, value in zip(headers_row, row):
-                    element.update({key: value})
-                table.append(element)
-
-            tables.update({sheet_name: table})
-        return tables
+                table.append(dict(zip(headers_row, row)))
+                if len(table) >= chunk_size:
+                    yield table
+                    table = []
+            if table:
+                yield table
+        finally:
+            workbook.close()
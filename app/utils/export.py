@@ -0,0 +1,35 @@
+import csv
+from io import StringIO
+from typing import AsyncIterator, Literal, Sequence, TypeAlias
+
+import orjson
+from sqlalchemy.engine import Row
+
+EXPORT_FORMAT: TypeAlias = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence[Row]],
+    columns: list[str],
+    export_format: EXPORT_FORMAT,
+) -> AsyncIterator[bytes]:
+    """Encodes every partition into one chunk, so memory is bounded by the partition size."""
+    if export_format == "csv":
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for partition in partitions:
+            writer.writerows(partition)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+    async for partition in partitions:
+        yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in partition)
@@ -0,0 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.utils.metaclass import Singleton
+
+
+class ProcessPool(metaclass=Singleton):
+    def __init__(self):
+        self._executor = ProcessPoolExecutor(
+            max_workers=settings.EXCEL_IMPORT_PROCESSES,
+        )
+
+    def get_executor(self):
+        return self._executor
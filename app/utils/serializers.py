@@ -0,0 +1,63 @@
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Callable, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+
+from app.databases.connect import Base
+
+
+def nested_model(annotation: Any) -> tuple[type[BaseModel], bool] | None:
+    """(model, is_list) for `Model`, `list[Model]` and their optional variants."""
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType):
+        for arg in get_args(annotation):
+            if arg is not type(None):
+                return nested_model(arg)
+        return None
+    if origin is list:
+        (item,) = get_args(annotation)
+        nested = nested_model(item)
+        return (nested[0], True) if nested else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+@lru_cache
+def get_dumper(model: type[BaseModel]) -> Callable[[Any], dict[str, Any]]:
+    """Compiles a function turning a trusted ORM object into a dict shaped like `model`.
+
+    Nothing is validated: values already come from the database in the right types and
+    are handed to orjson as is. Relations that were not loaded are dumped as their default.
+    """
+    plain: list[str] = []
+    nested: list[tuple[str, Callable[[Any], dict[str, Any]], bool, Any]] = []
+    for name, field in model.model_fields.items():
+        nested_field = nested_model(field.annotation)
+        if nested_field:
+            nested.append((name, get_dumper(nested_field[0]), nested_field[1], field.default))
+        else:
+            plain.append(name)
+
+    def dump(obj: Any) -> dict[str, Any]:
+        result = {name: getattr(obj, name) for name in plain}
+        if nested:
+            unloaded = inspect(obj).unloaded if isinstance(obj, Base) else ()
+            for name, nested_dump, is_list, default in nested:
+                value = default if name in unloaded else getattr(obj, name)
+                if value is None:
+                    result[name] = None
+                elif is_list:
+                    result[name] = [nested_dump(item) for item in value]
+                else:
+                    result[name] = nested_dump(value)
+        return result
+
+    return dump
+
+
+def dump_trusted(model: type[BaseModel], items: list[Any]) -> list[dict[str, Any]]:
+    dump = get_dumper(model)
+    return [dump(item) for item in items]
@@ -0,0 +1,3 @@
+def split_query_list(values: list[str] | None) -> list[str]:
+    """Flattens repeated and comma separated query values: ["a,b", "c"] -> ["a", "b", "c"]."""
+    return [value.strip() for item in values or [] for value in item.split(",") if value.strip()]
@@ -0,0 +1,148 @@
+"""Concurrent `allocate_serial_numbers` against one hot warehouse and against many warehouses.
+
+Unlike the other scripts the allocations have to commit to run concurrently, so the seeded
+warehouses and serial numbers are committed and deleted again at the end. For every level
+of concurrency `--allocations` orders of `--count` serial numbers are placed by that many
+asyncio workers, each on its own session, then the run checks that no serial number was
+handed out twice and that the warehouse counters (summed from stock_summary) match serial_number.
+`--hold-ms` keeps every allocation transaction open that long before it commits, standing in
+for order bookkeeping or network latency; with it, lock waits show up as lost throughput even
+when the database is CPU bound:
+
+    python -m benchmarks.allocate --allocations 400 --count 5 --workers 1,2,4,8 --hold-ms 20
+"""
+import argparse
+import asyncio
+from collections import Counter
+
+from sqlalchemy import delete, event, func, select, text
+
+from app.depends import async_context_get_db
+from app.models import Manufacturer, SerialNumber, SerialNumberStatusEnum, StockSummary, Supplier, Warehouse
+from app.schemas.serial_number import AllocateSerialNumbersModel
+from app.services.serial_number import SerialNumberService
+from benchmarks.utils import Timer, report, seed_warehouses
+
+
+async def seed(warehouses: int, per_warehouse: int) -> list[int]:
+    async with async_context_get_db() as db:
+        warehouse_ids = await seed_warehouses(db, warehouses)
+        await db.execute(
+            text(
+                "INSERT INTO serial_number (warehouse_id, name, status, price_input, data_input, created_at) "
+                "SELECT w, 'ALLOC-' || w || '-' || g, 'WAREHOUSE', 100, current_date - g % 365, now() "
+                "FROM unnest(CAST(:warehouse_ids AS integer[])) w, generate_series(1, :per_warehouse) g",
+            ),
+            {"warehouse_ids": warehouse_ids, "per_warehouse": per_warehouse},
+        )
+        await db.commit()
+    return warehouse_ids
+
+
+async def cleanup(warehouse_ids: list[int]) -> None:
+    async with async_context_get_db() as db:
+        supplier_id, manufacturer_id = (await db.execute(
+            select(Warehouse.supplier_id, Warehouse.manufacturer_id).where(Warehouse.id == warehouse_ids[0]),
+        )).one()
+        await db.execute(delete(SerialNumber).where(SerialNumber.warehouse_id.in_(warehouse_ids)))
+        await db.execute(delete(StockSummary).where(StockSummary.warehouse_id.in_(warehouse_ids)))
+        await db.execute(delete(Warehouse).where(Warehouse.id.in_(warehouse_ids)))
+        await db.execute(delete(Supplier).where(Supplier.id == supplier_id))
+        await db.execute(delete(Manufacturer).where(Manufacturer.id == manufacturer_id))
+        await db.commit()
+
+
+async def allocate(queue: asyncio.Queue, count: int, hold: float, allocated: list[int]) -> None:
+    while not queue.empty():
+        warehouse_id = queue.get_nowait()
+        async with async_context_get_db() as db:
+            if hold:
+                event.listen(
+                    db.sync_session,
+                    "before_commit",
+                    lambda session: session.execute(text("SELECT pg_sleep(:hold)"), {"hold": hold}),
+                )
+            result = await SerialNumberService(db).allocate_serial_numbers(
+                AllocateSerialNumbersModel(warehouse_id=warehouse_id, count=count, order_id=warehouse_id),
+            )
+        allocated.extend(row.id for row in result)
+
+
+async def check(warehouse_ids: list[int], allocated: list[int]) -> None:
+    duplicates = [item_id for item_id, seen in Counter(allocated).items() if seen > 1]
+    assert not duplicates, f"serial numbers allocated twice: {duplicates[:10]}"
+    async with async_context_get_db() as db:
+        live = select(
+            SerialNumber.warehouse_id,
+            func.count().filter(SerialNumber.status == SerialNumberStatusEnum.WAREHOUSE).label("in_stock"),
+            func.count().filter(SerialNumber.status != SerialNumberStatusEnum.WAREHOUSE).label("out"),
+        ).where(
+            SerialNumber.warehouse_id.in_(warehouse_ids),
+            SerialNumber.deleted_at.is_(None),
+        ).group_by(SerialNumber.warehouse_id).subquery()
+        q = await db.execute(
+            select(
+                Warehouse.id,
+                Warehouse.product_count_in_stock,
+                Warehouse.product_count_out,
+                live.c.in_stock,
+                live.c.out,
+            )
+            .join(live, live.c.warehouse_id == Warehouse.id)
+            .where(Warehouse.id.in_(warehouse_ids)),
+        )
+        for warehouse_id, in_stock, out, expected_in_stock, expected_out in q.all():
+            assert (in_stock, out) == (expected_in_stock, expected_out), (
+                f"warehouse {warehouse_id} counters {in_stock}/{out}, "
+                f"serial numbers {expected_in_stock}/{expected_out}"
+            )
+
+
+async def run(
+    name: str,
+    warehouse_ids: list[int],
+    allocations: int,
+    count: int,
+    workers: int,
+    hold: float,
+) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(allocations):
+        queue.put_nowait(warehouse_ids[index % len(warehouse_ids)])
+    allocated: list[int] = []
+    with Timer() as timer:
+        await asyncio.gather(*[allocate(queue, count, hold, allocated) for _ in range(workers)])
+    await check(warehouse_ids, allocated)
+    report(f"{name}, {workers} workers", timer.seconds, allocations, unit="orders")
+
+
+async def main(allocations: int, count: int, workers: list[int], warehouses: int, hold: float) -> None:
+    needed = allocations * count
+    hot = await seed(1, needed * len(workers))
+    spread = await seed(warehouses, needed * len(workers) // warehouses + count)
+    try:
+        for level in workers:
+            await run("one warehouse", hot, allocations, count, level, hold)
+        for level in workers:
+            await run(f"{warehouses} warehouses", spread, allocations, count, level, hold)
+        print("no serial number allocated twice, warehouse counters match serial_number")
+    finally:
+        await cleanup(hot)
+        await cleanup(spread)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--allocations", type=int, default=400)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma separated concurrency levels")
+    parser.add_argument("--warehouses", type=int, default=100)
+    parser.add_argument("--hold-ms", type=float, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.allocations,
+        args.count,
+        [int(level) for level in args.workers.split(",")],
+        args.warehouses,
+        args.hold_ms / 1000,
+    ))
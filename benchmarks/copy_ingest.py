@@ -0,0 +1,57 @@
+"""executemany `insert_bulk` against COPY-backed `copy_insert_bulk` for serial_number rows.
+
+Every run inserts into a fresh warehouse inside a transaction that is rolled back:
+
+    python -m benchmarks.copy_ingest --rows 50000 --repeat 3
+"""
+import argparse
+import asyncio
+from uuid import uuid4
+
+from app.databases.dao.serial_number import SerialNumberDAO
+from app.models import SerialNumber, SerialNumberStatusEnum
+from benchmarks.utils import Timer, report, rolled_back_session, seed_warehouses
+
+
+def make_items(warehouse_id: int, rows: int) -> list[dict]:
+    tag = uuid4().hex[:8]
+    return [
+        {
+            "warehouse_id": warehouse_id,
+            "name": f"{tag}-{i}",
+            "status": SerialNumberStatusEnum.WAREHOUSE,
+            "price_input": 100 + i % 1000,
+        }
+        for i in range(rows)
+    ]
+
+
+async def run(method: str, rows: int) -> float:
+    async with rolled_back_session() as db:
+        (warehouse_id,) = await seed_warehouses(db, 1)
+        items = make_items(warehouse_id, rows)
+        dao = SerialNumberDAO(db)
+        with Timer() as timer:
+            if method == "copy_insert_bulk":
+                await dao.copy_insert_bulk(
+                    items=items,
+                    index_elements=["name"],
+                    index_where=SerialNumber.deleted_at.is_(None),
+                )
+            else:
+                await dao.insert_bulk(items=items)
+        return timer.seconds
+
+
+async def main(rows: int, repeat: int) -> None:
+    for method in ("insert_bulk", "copy_insert_bulk"):
+        best = min([await run(method, rows) for _ in range(repeat)])
+        report(f"{method} ({rows} rows, best of {repeat})", best, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
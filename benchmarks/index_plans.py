@@ -0,0 +1,137 @@
+"""EXPLAIN check that the hot soft-delete lookups use the indexes meant for them.
+
+Seeds `--manufacturers` manufacturers and suppliers, twice as many warehouses and ten
+times as many serial numbers, soft-deletes every third row, all inside a transaction
+that is rolled back, then prints the plan of each query and fails if the expected
+index does not show up in it:
+
+* the duplicate checks of the create paths (`unless_exists` of insert_returning) and
+  the live-key lookups of the batches, on the columns of each table's partial index;
+* the warehouses of a supplier and of a manufacturer (the warehouse FK indexes);
+* the in-stock serial numbers of a warehouse, oldest first (allocate);
+* a keyset list page of each table, which reads the primary key.
+
+    python -m benchmarks.index_plans --manufacturers 30000
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import Select, select, text
+
+from app.databases.dao.base_dao import BaseDAO
+from app.databases.dao.manufacturer import ManufacturerDAO
+from app.databases.dao.serial_number import SerialNumberDAO
+from app.databases.dao.supplier import SupplierDAO
+from app.databases.dao.warehouse import WarehouseDAO
+from app.models import Manufacturer, SerialNumber, SerialNumberStatusEnum, Supplier, Warehouse
+from benchmarks.utils import rolled_back_session
+
+SEED = [
+    "INSERT INTO manufacturer (name, country, created_at) "
+    "SELECT 'M-' || g, 'C-' || g % 50, now() FROM generate_series(1, :rows) g",
+    "INSERT INTO supplier (name, country, address, phone, email, created_at) "
+    "SELECT 'S-' || g, 'C-' || g % 50, 'A-' || g, 'P-' || g, g || '@s', now() FROM generate_series(1, :rows) g",
+    "INSERT INTO warehouse (manufacturer_id, supplier_id, article, name, warranty, created_at) "
+    "SELECT m.min + g % :rows, s.min + g % :rows, 'A-' || g, 'W-' || g, 12, now() "
+    "FROM generate_series(1, 2 * :rows) g, "
+    "(SELECT min(id) FROM manufacturer WHERE name LIKE 'M-%') m, (SELECT min(id) FROM supplier WHERE name LIKE 'S-%') s",
+    "INSERT INTO serial_number (warehouse_id, name, status, price_input, data_input, created_at) "
+    "SELECT w.min + g % (2 * :rows), 'SN-' || g, "
+    "(ARRAY['WAREHOUSE', 'SOLD'])[1 + g % 2]::serialnumberstatusenum, 100, current_date - g % 365, now() "
+    "FROM generate_series(1, 10 * :rows) g, (SELECT min(id) FROM warehouse WHERE name LIKE 'W-%') w",
+]
+
+
+def cases(rows: int) -> list[tuple[str, str, BaseDAO, Select]]:
+    """(label, expected index, dao, query) of every checked lookup."""
+    middle = rows // 2
+    manufacturer_lookup = [
+        Manufacturer.name == f"M-{middle}",
+        Manufacturer.country == f"C-{middle % 50}",
+        Manufacturer.deleted_at.is_(None),
+    ]
+    supplier_lookup = [
+        Supplier.name == f"S-{middle}",
+        Supplier.country == f"C-{middle % 50}",
+        Supplier.address == f"A-{middle}",
+        Supplier.phone == f"P-{middle}",
+        Supplier.email == f"{middle}@s",
+        Supplier.deleted_at.is_(None),
+    ]
+    warehouse_lookup = [
+        Warehouse.name == f"W-{middle}",
+        Warehouse.article == f"A-{middle}",
+        Warehouse.deleted_at.is_(None),
+    ]
+    some_supplier = select(Supplier.id).where(Supplier.name == f"S-{middle}").scalar_subquery()
+    some_manufacturer = select(Manufacturer.id).where(Manufacturer.name == f"M-{middle}").scalar_subquery()
+    some_warehouse = select(Warehouse.id).where(Warehouse.name == f"W-{middle}").scalar_subquery()
+    return [
+        ("manufacturer create duplicate check", "ix_manufacturer_name_country", ManufacturerDAO,
+         select(Manufacturer.id).where(*manufacturer_lookup)),
+        ("supplier create duplicate check", "ix_supplier_lookup", SupplierDAO,
+         select(Supplier.id).where(*supplier_lookup)),
+        ("warehouse create duplicate check", "ux_warehouse_name_article", WarehouseDAO,
+         select(Warehouse.id).where(*warehouse_lookup)),
+        ("serial number create duplicate check", "ux_serial_number_name", SerialNumberDAO,
+         select(SerialNumber.id).where(SerialNumber.name == f"SN-{middle}", SerialNumber.deleted_at.is_(None))),
+        ("warehouses of a supplier", "ix_warehouse_supplier_id", WarehouseDAO,
+         select(Warehouse.id).where(Warehouse.supplier_id == some_supplier)),
+        ("warehouses of a manufacturer", "ix_warehouse_manufacturer_id", WarehouseDAO,
+         select(Warehouse.id).where(Warehouse.manufacturer_id == some_manufacturer)),
+        ("allocate: in stock of a warehouse", "ix_serial_number_warehouse_status_data_input", SerialNumberDAO,
+         select(SerialNumber.id).where(
+             SerialNumber.warehouse_id == some_warehouse,
+             SerialNumber.status == SerialNumberStatusEnum.WAREHOUSE,
+             SerialNumber.deleted_at.is_(None),
+         ).order_by(SerialNumber.data_input, SerialNumber.id).limit(5)),
+        *[
+            (f"{dao.model.__tablename__} keyset page", f"{dao.model.__tablename__}_pkey", dao, None)
+            for dao in (ManufacturerDAO, SupplierDAO, WarehouseDAO, SerialNumberDAO)
+        ],
+    ]
+
+
+async def main(rows: int) -> None:
+    failed = []
+    async with rolled_back_session() as db:
+        for statement in SEED:
+            await db.execute(text(statement), {"rows": rows})
+        for table in ("manufacturer", "supplier", "warehouse", "serial_number"):
+            await db.execute(text(f"UPDATE {table} SET deleted_at = now() WHERE id % 3 = 0"))
+            await db.execute(text(f"ANALYZE {table}"))
+        print(f"{rows} manufacturers and suppliers, {2 * rows} warehouses, {10 * rows} serial numbers, "
+              f"a third soft-deleted")
+
+        for label, index, dao_class, query in cases(rows):
+            dao = dao_class(db)
+            if query is None:
+                # what get_page sends for the second page of 100
+                query = dao._construct_query(
+                    select(dao.model),
+                    where=[*dao.search_where(), dao.model.id > 100],
+                    order_by=[dao.model.id],
+                    limit=101,
+                )
+            plan = [line for (line,) in (await db.execute(
+                text("EXPLAIN " + str(query.compile(
+                    dialect=db.get_bind().dialect,
+                    compile_kwargs={"literal_binds": True},
+                ))),
+            )).all()]
+            used = any(index in line for line in plan)
+            print(f"{'ok  ' if used else 'FAIL'} {label}: {index}")
+            for line in plan:
+                print(f"    {line}")
+            if not used:
+                failed.append(label)
+    if failed:
+        sys.exit(f"expected index not used by: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manufacturers", type=int, default=30_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.manufacturers))
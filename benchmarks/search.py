@@ -0,0 +1,75 @@
+"""Latency of the serial number `search` filter at a given table size.
+
+Seeds `--rows` serial numbers (1M by default) inside a transaction that is rolled back,
+then times a keyset page of the list query for an empty search, a selective substring
+and a common one, and prints the plan of each so the use of ix_serial_number_name_trgm
+is visible. The empty search is also timed the way it was sent before it was skipped,
+as ILIKE '%%':
+
+    python -m benchmarks.search --rows 1000000 --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import select, text
+
+from app.databases.dao.serial_number import SerialNumberDAO
+from benchmarks.utils import Timer, rolled_back_session, seed_warehouses
+
+SEARCHES = ["", "SN-0042424", "SN-00"]
+
+
+async def main(rows: int, repeat: int, limit: int) -> None:
+    async with rolled_back_session() as db:
+        warehouse_ids = await seed_warehouses(db, 100)
+        await db.execute(
+            text(
+                "INSERT INTO serial_number (warehouse_id, name, status, price_input, data_input, created_at) "
+                "SELECT (CAST(:warehouse_ids AS integer[]))[1 + g % 100], 'SN-' || lpad(g::text, 7, '0'), 'WAREHOUSE', 100, "
+                "current_date, now() FROM generate_series(1, :rows) g",
+            ),
+            {"warehouse_ids": warehouse_ids, "rows": rows},
+        )
+        await db.execute(text("ANALYZE serial_number"))
+        has_index = (await db.execute(
+            text("SELECT count(*) FROM pg_indexes WHERE indexname = 'ix_serial_number_name_trgm'"),
+        )).scalar_one()
+        print(f"{rows} serial numbers, trigram index {'present' if has_index else 'missing'}")
+
+        dao = SerialNumberDAO(db)
+        cases = [(repr(search), dao.search_where(search=search)) for search in SEARCHES]
+        cases.append(("'' as ILIKE '%%'", [dao.model.deleted_at.is_(None), dao.model.name.ilike("%%")]))
+        for label, where in cases:
+            timings = []
+            for _ in range(repeat):
+                with Timer() as timer:
+                    page, _ = await dao.get_page(limit=limit, where=where)
+                timings.append(timer.seconds)
+            query = dao._construct_query(
+                select(dao.model),
+                where=where,
+                order_by=[dao.model.id],
+                limit=limit,
+            )
+            print(
+                f"search={label:<18} {statistics.median(timings) * 1000:9.1f} ms median, "
+                f"{len(page)} rows",
+            )
+            plan = await db.execute(
+                text("EXPLAIN " + str(query.compile(
+                    dialect=db.get_bind().dialect,
+                    compile_kwargs={"literal_binds": True},
+                ))),
+            )
+            for (line,) in plan.all():
+                print(f"    {line}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat, args.limit))
@@ -0,0 +1,91 @@
+"""Response encoding of the warehouse listing: FastAPI response_model path vs `dump_trusted`.
+
+Builds in-memory Warehouse objects with nested serial numbers, supplier and manufacturer
+(no database needed) and encodes them the way each path does:
+
+* response_model: FastAPI's serialize_response (validation from attributes, then a JSON
+  mode dump) rendered by ORJSONResponse, what list endpoints do with FAST_JSON_RESPONSES off;
+* dump_trusted: the compiled dumper rendered by ORJSONResponse, the default path.
+
+    python -m benchmarks.serialization --warehouses 1000 --serial-numbers 20 --repeat 5
+"""
+import argparse
+import asyncio
+import datetime
+import statistics
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import Manufacturer, SerialNumber, SerialNumberStatusEnum, Supplier, Warehouse
+from app.schemas.warehouse import WarehouseWithSerialNumberModel
+from app.utils.serializers import dump_trusted
+from benchmarks.utils import Timer, report
+
+
+def make_warehouses(count: int, serial_numbers: int) -> list[Warehouse]:
+    supplier = Supplier(id=1, name="Supplier", country="BY", address="-", phone="-", email="-")
+    manufacturer = Manufacturer(id=1, name="Manufacturer", country="CN")
+    today = datetime.date.today()
+    return [
+        Warehouse(
+            id=i,
+            manufacturer_id=1,
+            supplier_id=1,
+            article=f"A{i}",
+            name=f"Product {i}",
+            warranty=12,
+            product_count_in_stock=serial_numbers,
+            product_count_out=0,
+            supplier=supplier,
+            manufacturer=manufacturer,
+            serial_numbers=[
+                SerialNumber(
+                    id=i * serial_numbers + j,
+                    warehouse_id=i,
+                    name=f"SN-{i}-{j}",
+                    status=SerialNumberStatusEnum.WAREHOUSE,
+                    price_input=100,
+                    data_input=today,
+                )
+                for j in range(serial_numbers)
+            ],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+async def main(warehouses: int, serial_numbers: int, repeat: int) -> None:
+    items = make_warehouses(warehouses, serial_numbers)
+    field = create_response_field(name="Response", type_=list[WarehouseWithSerialNumberModel])
+
+    async def response_model() -> bytes:
+        content = await serialize_response(field=field, response_content=items, is_coroutine=True)
+        return ORJSONResponse(content=content).body
+
+    async def trusted() -> bytes:
+        return ORJSONResponse(content=dump_trusted(WarehouseWithSerialNumberModel, items)).body
+
+    assert await response_model() == await trusted()
+    for name, encode in (("response_model", response_model), ("dump_trusted", trusted)):
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                await encode()
+            timings.append(timer.seconds)
+        report(
+            f"{name} ({warehouses} x {serial_numbers} serial numbers)",
+            statistics.median(timings),
+            warehouses,
+            unit="warehouses",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warehouses", type=int, default=1000)
+    parser.add_argument("--serial-numbers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.warehouses, args.serial_numbers, args.repeat))
@@ -0,0 +1,66 @@
+"""Per-warehouse stock totals: on-the-fly GROUP BY over serial_number vs the stock_summary table.
+
+Seeds `--rows` serial numbers over `--warehouses` warehouses inside a transaction that is
+rolled back (the triggers fill stock_summary as they would in production), then times
+ReportDAO.stock_summary(group_by="warehouse"), StockSummaryDAO.get_warehouse_totals and
+the state read:
+
+    python -m benchmarks.stock_summary --rows 500000 --warehouses 1000 --repeat 10
+"""
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import text
+
+from app.databases.dao.report import ReportDAO
+from app.databases.dao.stock_summary import StockSummaryDAO
+from benchmarks.utils import Timer, rolled_back_session, seed_warehouses
+
+
+async def main(rows: int, warehouses: int, repeat: int) -> None:
+    async with rolled_back_session() as db:
+        warehouse_ids = await seed_warehouses(db, warehouses)
+        await db.execute(
+            text(
+                "INSERT INTO serial_number (warehouse_id, name, status, price_input, price_output, "
+                "data_input, created_at) "
+                "SELECT (CAST(:warehouse_ids AS integer[]))[1 + g % :warehouses], 'SN-' || g, "
+                "(ARRAY['WAREHOUSE', 'SOLD', 'SUPPLIER', 'EXECUTOR'])[1 + g % 4]::serialnumberstatusenum, "
+                "100, CASE WHEN g % 4 = 1 THEN 150 END, current_date, now() "
+                "FROM generate_series(1, :rows) g",
+            ),
+            {"warehouse_ids": warehouse_ids, "warehouses": warehouses, "rows": rows},
+        )
+        await db.execute(text("ANALYZE serial_number"))
+        await db.execute(text("ANALYZE stock_summary"))
+
+        report_dao, summary_dao = ReportDAO(db), StockSummaryDAO(db)
+        cases = {
+            "live GROUP BY (stock_summary)": lambda: report_dao.stock_summary(group_by="warehouse"),
+            "stock_summary table (warehouse_stock)": lambda: summary_dao.get_warehouse_totals(),
+            "state (warehouse_stock/state)": lambda: summary_dao.get_refresh_state(),
+        }
+        results = {}
+        for name, run in cases.items():
+            timings = []
+            for _ in range(repeat):
+                with Timer() as timer:
+                    results[name] = await run()
+                timings.append(timer.seconds)
+            print(f"{name:<40} {statistics.median(timings) * 1000:9.2f} ms median")
+
+        live = {row.id: row.serial_numbers for row in results["live GROUP BY (stock_summary)"]}
+        summary = {row.id: row.serial_numbers for row in results["stock_summary table (warehouse_stock)"]}
+        seeded = {key: value for key, value in live.items() if key in set(warehouse_ids)}
+        assert seeded == {key: summary[key] for key in seeded}, "summary differs from live totals"
+        print(f"{rows} serial numbers over {warehouses} warehouses, summary matches live totals")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--warehouses", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.warehouses, args.repeat))
@@ -0,0 +1,64 @@
+"""Helpers shared by the benchmark scripts; they run against the database from app settings."""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.depends import async_context_get_db
+from app.models import Manufacturer, Supplier, Warehouse
+
+
+@asynccontextmanager
+async def rolled_back_session() -> AsyncIterator[AsyncSession]:
+    """A session whose work is rolled back on exit, so a run leaves the database as it found it."""
+    async with async_context_get_db() as db:
+        try:
+            yield db
+        finally:
+            await db.rollback()
+
+
+async def seed_warehouses(db: AsyncSession, count: int) -> list[int]:
+    """Creates a supplier, a manufacturer and `count` warehouses; returns the warehouse ids."""
+    tag = uuid4().hex[:8]
+    supplier_id = (await db.execute(
+        insert(Supplier)
+        .values(name=f"bench {tag}", country="-", address="-", phone="-", email="-")
+        .returning(Supplier.id),
+    )).scalar_one()
+    manufacturer_id = (await db.execute(
+        insert(Manufacturer).values(name=f"bench {tag}", country="-").returning(Manufacturer.id),
+    )).scalar_one()
+    q = await db.execute(
+        insert(Warehouse).returning(Warehouse.id),
+        [
+            {
+                "supplier_id": supplier_id,
+                "manufacturer_id": manufacturer_id,
+                "article": f"{tag}-{i}",
+                "name": f"bench {tag} {i}",
+                "warranty": 12,
+            }
+            for i in range(count)
+        ],
+    )
+    return list(q.scalars().all())
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.seconds = time.perf_counter() - self._start
+
+
+def report(name: str, seconds: float, items: int, unit: str = "rows") -> None:
+    print(f"{name:<40} {seconds * 1000:10.1f} ms {items / seconds:12.0f} {unit}/s")